@@ -0,0 +1,123 @@
+import argparse
+import io
+import os
+import sys
+import time
+from multiprocessing import Pool
+import numpy as np
+import psycopg2
+from psycopg2.extras import execute_values
+from PIL import Image
+import db
+import face_store
+import image_store
+import job_state
+
+CHUNK_SIZE = 200
+
+
+def embed_voter(task):
+    voter_id, data, model_name = task
+    try:
+        image_bgr = np.array(Image.open(io.BytesIO(data)).convert("RGB"))[:, :, ::-1]
+        return voter_id, face_store.compute_embedding(image_bgr, model_name).tobytes(), None
+    except Exception as e:
+        return voter_id, None, str(e)
+
+
+def fetch_chunk(cur, model_name, after_id, limit):
+    # Keyset scan over voters still missing an embedding for this model.
+    # The photos then come in one bulk fetch for the whole chunk.
+    cur.execute(
+        """
+        SELECT v.id FROM voters v
+        WHERE v.id > %s AND NOT EXISTS (
+            SELECT 1 FROM face_embeddings e WHERE e.voter_id = v.id AND e.model_name = %s
+        )
+        ORDER BY v.id LIMIT %s
+        """,
+        (after_id, model_name, limit)
+    )
+    voter_ids = [row[0] for row in cur.fetchall()]
+    images = image_store.fetch_images(cur, voter_ids)
+    return [(voter_id, images[voter_id]) for voter_id in voter_ids if voter_id in images]
+
+
+def busy_backends(cur):
+    cur.execute("SELECT count(*) FROM pg_stat_activity WHERE state = 'active' AND pid <> pg_backend_pid()")
+    return cur.fetchone()[0]
+
+
+def backfill(model_name, workers, chunk_size, max_rate, max_active, job):
+    with db.cursor() as cur:
+        state = job_state.load_state(cur, job)
+    watermark = state.get("watermark", 0)
+    done = state.get("done", 0)
+    failed = state.get("failed", 0)
+    if watermark:
+        print(f"Resuming {job} after voter {watermark} ({done} embedded so far).")
+
+    started = time.perf_counter()
+    done_now = 0
+
+    with Pool(workers) as pool:
+        while True:
+            with db.cursor() as cur:
+                # Yield to booth traffic: wait while the database is busy.
+                while max_active is not None and busy_backends(cur) > max_active:
+                    time.sleep(1.0)
+                chunk = fetch_chunk(cur, model_name, watermark, chunk_size)
+            if not chunk:
+                break
+
+            chunk_started = time.perf_counter()
+            results = pool.map(embed_voter, [(voter_id, data, model_name) for voter_id, data in chunk])
+            rows = []
+            for voter_id, embedding, error in results:
+                if error is None:
+                    rows.append((voter_id, model_name, psycopg2.Binary(embedding)))
+                else:
+                    failed += 1
+                    print(f"Skipping voter {voter_id}: {error}", file=sys.stderr)
+
+            watermark = chunk[-1][0]
+            with db.cursor() as cur:
+                # A booth may have embedded one of these voters meanwhile; keep its row.
+                execute_values(
+                    cur,
+                    "INSERT INTO face_embeddings (voter_id, model_name, embedding) VALUES %s "
+                    "ON CONFLICT (voter_id, model_name) DO NOTHING",
+                    rows
+                )
+                job_state.save_state(cur, job, {"watermark": watermark, "done": done + len(rows), "failed": failed})
+            done += len(rows)
+            done_now += len(rows)
+
+            if max_rate:
+                time.sleep(max(0.0, len(chunk) / max_rate - (time.perf_counter() - chunk_started)))
+
+            rate = done_now / (time.perf_counter() - started)
+            print(f"voter {watermark}: {done} embedded, {failed} failed, {rate:.0f} rows/s")
+
+    print(f"Done: {done} embeddings written, {failed} failed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Compute missing face embeddings for enrolled voters")
+    parser.add_argument("--model", default=face_store.MODEL_NAME)
+    parser.add_argument("--workers", type=int, default=max(1, (os.cpu_count() or 2) // 2))
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--max-rate", type=float, default=None, help="cap on voters embedded per second")
+    parser.add_argument("--max-active", type=int, default=4,
+                        help="pause while more than this many other queries are running")
+    parser.add_argument("--restart", action="store_true", help="discard the watermark and rescan from the start")
+    args = parser.parse_args()
+
+    job = f"backfill:{args.model}"
+    try:
+        if args.restart:
+            with db.cursor() as cur:
+                job_state.clear_state(cur, job)
+        backfill(args.model, args.workers, args.chunk_size, args.max_rate, args.max_active, job)
+    except psycopg2.Error as e:
+        print(f"Error backfilling embeddings: {e}")
@@ -0,0 +1,230 @@
+import argparse
+import io
+import json
+import os
+import random
+import subprocess
+import sys
+import tempfile
+import time
+import cv2
+import numpy as np
+import psycopg2
+from psycopg2 import sql
+from PIL import Image
+import db
+import face_store
+import generate_roll
+import migrate
+import thumbnails
+import voting
+from booth_store import BoothStore
+from face_model import FaceModelManager
+from name_index import NameIndex
+from voter_list import DbVoterSource
+
+# The suite runs against its own database so it never touches a real roll.
+BENCH_DB = "evm_bench"
+
+SEARCH_TERMS = ["r", "ra", "ram", "rame", "rames", "s", "su", "sun", "suni", "sunit"]
+
+
+def percentiles(samples):
+    return {
+        "n": len(samples),
+        "p50": round(float(np.percentile(samples, 50)), 3),
+        "p95": round(float(np.percentile(samples, 95)), 3),
+        "p99": round(float(np.percentile(samples, 99)), 3),
+    }
+
+
+def timed(fn, iterations, *args_for):
+    samples = []
+    for n in range(iterations):
+        args = args_for[0](n) if args_for else ()
+        started = time.perf_counter()
+        fn(*args)
+        samples.append((time.perf_counter() - started) * 1000)
+    return percentiles(samples)
+
+
+def prepare_database(dbname, voters, parties, seed_value, embeddings, reseed):
+    conn = db.connect(dbname="postgres")
+    conn.autocommit = True
+    cur = conn.cursor()
+    cur.execute("SELECT 1 FROM pg_database WHERE datname = %s", (dbname,))
+    if cur.fetchone() is None:
+        cur.execute(sql.SQL("CREATE DATABASE {}").format(sql.Identifier(dbname)))
+    conn.close()
+
+    migrate.migrate()
+    with db.cursor() as cur:
+        cur.execute("SELECT count(*) FROM voters")
+        current = cur.fetchone()[0]
+    if reseed or current != voters:
+        print(f"Seeding {voters} voters and {parties} parties into {dbname}...", file=sys.stderr)
+        generate_roll.generate(voters, parties, seed_value, turnout=0.3,
+                               embeddings="random" if embeddings else "none")
+
+
+def run_suite(voters, iterations, face):
+    rng = random.Random(1)
+    results = {}
+
+    def load_voters():
+        source = DbVoterSource()
+        source.fetch(0, 25)
+    results["load_voters"] = timed(load_voters, iterations)
+
+    index_conn = db.connect()
+    started = time.perf_counter()
+    with index_conn.cursor(name="name_index") as cur:
+        cur.itersize = 10000
+        cur.execute("SELECT id, name, vote_status FROM voters ORDER BY id")
+        name_index = NameIndex.from_cursor(cur)
+    index_conn.close()
+    results["build_name_index"] = percentiles([(time.perf_counter() - started) * 1000])
+
+    # One sample per keystroke, each narrowing the previous result like the UI does.
+    keystrokes = []
+    for _ in range(max(1, iterations // len(SEARCH_TERMS))):
+        previous = None
+        for term in SEARCH_TERMS:
+            started = time.perf_counter()
+            positions = name_index.search(term, previous)
+            keystrokes.append((time.perf_counter() - started) * 1000)
+            previous = (term, positions)
+    results["search_voters"] = percentiles(keystrokes)
+
+    def search_db(term):
+        with db.cursor() as cur:
+            db.execute(cur, "search_voters", (f"%{term}%",))
+            cur.fetchall()
+    results["search_voters_db"] = timed(search_db, iterations, lambda n: (SEARCH_TERMS[n % len(SEARCH_TERMS)],))
+
+    def voter_select(voter_id):
+        with db.cursor() as cur:
+            image, _ = thumbnails.load_thumbnail(cur, voter_id, "booth")
+        np.array(image)
+    results["on_voter_select"] = timed(voter_select, iterations, lambda n: (rng.randint(1, voters),))
+
+    if face:
+        face_model = FaceModelManager()
+        face_model.start_warmup()
+        face_model.wait()
+
+        # Stands in for the camera frame, decoded once outside the timings.
+        with db.cursor() as cur:
+            db.execute(cur, "voter_image", (1,))
+            frame = cv2.cvtColor(np.array(Image.open(io.BytesIO(cur.fetchone()[0])).convert("RGB")),
+                                 cv2.COLOR_RGB2BGR)
+
+        def verify(voter_id):
+            with db.cursor() as cur:
+                db.execute(cur, "voter_status", (voter_id,))
+                cur.fetchone()
+                stored = face_store.load_embedding(cur, voter_id)
+            live = face_model.embed(frame)
+            if stored is not None and len(stored) == len(live):
+                face_store.is_match(stored, live)
+        results["verify_face"] = timed(verify, max(1, iterations // 10), lambda n: (rng.randint(1, voters),))
+
+    with db.cursor() as cur:
+        cur.execute("SELECT id FROM voters WHERE vote_status = FALSE ORDER BY id LIMIT %s", (iterations,))
+        fresh = [row[0] for row in cur.fetchall()]
+        cur.execute("SELECT id FROM party ORDER BY id")
+        parties = [row[0] for row in cur.fetchall()]
+
+    def cast_vote(voter_id):
+        with db.cursor() as cur:
+            voting.commit_vote(cur, voter_id, rng.choice(parties), "bench")
+    if fresh:
+        results["cast_vote"] = timed(cast_vote, len(fresh), lambda n: (fresh[n],))
+    else:
+        print("Skipping cast_vote: every voter in the roll has already voted (try --reseed).", file=sys.stderr)
+
+    # Hand the voters back so the next run times the same work.
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM votes WHERE booth_id = 'bench'")
+        cur.execute("DELETE FROM vote_tally WHERE booth_id = 'bench'")
+        cur.execute("UPDATE voters SET vote_status = FALSE WHERE id = ANY(%s)", (fresh,))
+
+    with tempfile.TemporaryDirectory() as tmp:
+        store = BoothStore(os.path.join(tmp, "booth.db"), "bench")
+        results["cast_vote_local"] = timed(store.record_vote, iterations,
+                                           lambda n: (n + 1, rng.choice(parties)))
+        store.close()
+
+    def show_results():
+        with db.cursor() as cur:
+            db.execute(cur, "results")
+            cur.fetchall()
+    results["show_results"] = timed(show_results, iterations)
+
+    return results
+
+
+def git_commit():
+    try:
+        return subprocess.check_output(["git", "rev-parse", "--short", "HEAD"], text=True,
+                                       cwd=os.path.dirname(os.path.abspath(__file__))).strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(report, baseline_path, tolerance):
+    with open(baseline_path) as f:
+        baseline = json.load(f)
+
+    regressed = []
+    print(f"{'path':<18} {'base p95':>10} {'p95':>10} {'change':>8}", file=sys.stderr)
+    for path, stats in report["results"].items():
+        before = baseline["results"].get(path)
+        if before is None:
+            continue
+        change = (stats["p95"] - before["p95"]) / before["p95"] if before["p95"] else 0.0
+        flag = ""
+        if change > tolerance:
+            regressed.append(path)
+            flag = "  REGRESSION"
+        print(f"{path:<18} {before['p95']:>9.2f}ms {stats['p95']:>9.2f}ms {change:>+7.1%}{flag}", file=sys.stderr)
+    return regressed
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Time the booth's hot paths against a seeded synthetic roll")
+    parser.add_argument("--dbname", default=BENCH_DB)
+    parser.add_argument("--voters", type=int, default=20000)
+    parser.add_argument("--parties", type=int, default=12)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--iterations", type=int, default=200)
+    parser.add_argument("--reseed", action="store_true", help="reseed even if the roll already has --voters rows")
+    parser.add_argument("--no-face", action="store_true", help="skip verify_face (needs DeepFace and its model)")
+    parser.add_argument("--output", help="write the JSON report here as well as to stdout")
+    parser.add_argument("--compare", help="baseline JSON report to compare p95 against")
+    parser.add_argument("--tolerance", type=float, default=0.10, help="p95 increase counted as a regression")
+    args = parser.parse_args()
+
+    # db reads EVM_DB_NAME on every connect, and the pool does not exist yet.
+    os.environ["EVM_DB_NAME"] = args.dbname
+    try:
+        prepare_database(args.dbname, args.voters, args.parties, args.seed, not args.no_face, args.reseed)
+        results = run_suite(args.voters, args.iterations, not args.no_face)
+    except psycopg2.Error as e:
+        sys.exit(f"Benchmark failed: {e}")
+
+    report = {
+        "commit": git_commit(),
+        "voters": args.voters,
+        "parties": args.parties,
+        "iterations": args.iterations,
+        "results": results,
+    }
+    output = json.dumps(report, indent=2)
+    print(output)
+    if args.output:
+        with open(args.output, "w") as f:
+            f.write(output + "\n")
+
+    if args.compare and compare(report, args.compare, args.tolerance):
+        sys.exit(1)
@@ -0,0 +1,59 @@
+import argparse
+import time
+import numpy as np
+from face_index import ExactIndex, IVFIndex
+
+
+def synthetic_roll(size, dim, rng, clusters=256):
+    # Real face embeddings cluster by age, skin tone, pose and lighting;
+    # a mixture of gaussians is closer to that than uniform noise.
+    centres = rng.standard_normal((clusters, dim), dtype=np.float32)
+    labels = rng.integers(clusters, size=size)
+    return centres[labels] + rng.standard_normal((size, dim), dtype=np.float32) * 0.6
+
+
+def time_search(index, queries, k):
+    results = []
+    timings = []
+    for query in queries:
+        start = time.perf_counter()
+        results.append([voter_id for voter_id, _ in index.search(query, k)])
+        timings.append((time.perf_counter() - start) * 1000)
+    return results, np.array(timings)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Recall vs latency of the IVF face index against exact search")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--dim", type=int, default=512)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, nargs="+", default=[1, 4, 8, 16, 32, 64])
+    parser.add_argument("--queries", type=int, default=200)
+    parser.add_argument("--k", type=int, default=10)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    ids = np.arange(1, args.size + 1)
+    vectors = synthetic_roll(args.size, args.dim, rng)
+    targets = rng.integers(args.size, size=args.queries)
+    queries = vectors[targets] + rng.standard_normal((args.queries, args.dim), dtype=np.float32) * 0.3
+
+    nlist = args.nlist or int(4 * args.size ** 0.5)
+    start = time.perf_counter()
+    ivf = IVFIndex.build(ids, vectors, nlist)
+    print(f"IVF build: {nlist} lists, {time.perf_counter() - start:.1f} s")
+
+    exact = ExactIndex(ids, vectors)
+    del vectors
+    truth, timings = time_search(exact, queries, args.k)
+    print(f"exact          p50={np.percentile(timings, 50):7.2f} ms  p95={np.percentile(timings, 95):7.2f} ms")
+
+    for nprobe in args.nprobe:
+        ivf.nprobe = nprobe
+        found, timings = time_search(ivf, queries, args.k)
+        recall = np.mean([len(set(a) & set(b)) / len(b) for a, b in zip(found, truth)])
+        top1 = np.mean([a[0] == b[0] for a, b in zip(found, truth)])
+        print(f"nprobe={nprobe:<4}    p50={np.percentile(timings, 50):7.2f} ms  "
+              f"p95={np.percentile(timings, 95):7.2f} ms  "
+              f"recall@{args.k}={recall:.3f}  top1={top1:.3f}")
@@ -0,0 +1,38 @@
+import argparse
+import time
+import numpy as np
+import face_store
+from face_index import ExactIndex
+
+
+def run(size, dim, queries, rng):
+    vectors = rng.standard_normal((size, dim), dtype=np.float32)
+    index = ExactIndex(np.arange(1, size + 1), vectors)
+    del vectors
+
+    timings = []
+    for _ in range(queries):
+        target = rng.integers(size)
+        query = index.matrix[target] + rng.standard_normal(dim, dtype=np.float32) * 0.01
+        start = time.perf_counter()
+        index.search(query, k=1)
+        timings.append((time.perf_counter() - start) * 1000)
+
+    timings = np.array(timings)
+    print(f"{size:>9} voters  dim={dim}  {index.matrix.nbytes / 1e9:.2f} GB  "
+          f"mean={timings.mean():.2f} ms  p50={np.percentile(timings, 50):.2f} ms  "
+          f"p95={np.percentile(timings, 95):.2f} ms")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Benchmark 1:N face identification over the enrolled roll")
+    parser.add_argument("--sizes", type=int, nargs="+", default=[10_000, 100_000, 1_000_000])
+    parser.add_argument("--dim", type=int, default=face_store.EMBEDDING_SIZES[face_store.MODEL_NAME],
+                        help="embedding length (defaults to the booth model's)")
+    parser.add_argument("--queries", type=int, default=50)
+    parser.add_argument("--seed", type=int, default=0)
+    args = parser.parse_args()
+
+    rng = np.random.default_rng(args.seed)
+    for size in args.sizes:
+        run(size, args.dim, args.queries, rng)
@@ -0,0 +1,96 @@
+import argparse
+import io
+import time
+import numpy as np
+import psycopg2
+from PIL import Image
+import db
+import face_store
+import image_codec
+
+# Codec variants compared against the original PNG photos: (format, quality, face_crop).
+VARIANTS = [
+    ("png", None, False),
+    ("jpeg", 90, False),
+    ("jpeg", 75, False),
+    ("webp", 90, False),
+    ("webp", 75, False),
+    ("webp", 75, True),
+]
+
+SETUP = """
+    DROP TABLE IF EXISTS bench_images;
+    CREATE TABLE bench_images (id INTEGER PRIMARY KEY, data BYTEA NOT NULL);
+"""
+TEARDOWN = "DROP TABLE IF EXISTS bench_images"
+
+
+def sample_photos(cur, count):
+    cur.execute(
+        """
+        SELECT b.data FROM voters v JOIN image_blobs b ON b.sha256 = v.image_hash
+        ORDER BY v.id LIMIT %s
+        """,
+        (count,)
+    )
+    return [Image.open(io.BytesIO(bytes(row[0]))).convert("RGB") for row in cur.fetchall()]
+
+
+def fetch_and_decode(cur, encoded):
+    # The same work on_voter_select and verify_job do with a stored photo.
+    cur.execute(SETUP)
+    cur.executemany("INSERT INTO bench_images (id, data) VALUES (%s, %s)",
+                    [(n, psycopg2.Binary(data)) for n, data in enumerate(encoded)])
+    timings = []
+    for n in range(len(encoded)):
+        started = time.perf_counter()
+        cur.execute("SELECT data FROM bench_images WHERE id = %s", (n,))
+        Image.open(io.BytesIO(bytes(cur.fetchone()[0]))).convert("RGB").load()
+        timings.append((time.perf_counter() - started) * 1000)
+    return np.percentile(timings, 50), np.percentile(timings, 95)
+
+
+def embed(image):
+    return face_store.compute_embedding(np.array(image)[:, :, ::-1])
+
+
+def accuracy(references, encoded):
+    # Genuine: variant vs the same voter's original. Impostor: vs the next voter's.
+    decoded = [embed(Image.open(io.BytesIO(data)).convert("RGB")) for data in encoded]
+    genuine = [face_store.is_match(ref, emb) for ref, emb in zip(references, decoded)]
+    impostor = [face_store.is_match(references[(n + 1) % len(references)], emb) for n, emb in enumerate(decoded)]
+    return (
+        sum(match for match, _ in genuine) / len(genuine),
+        float(np.mean([distance for _, distance in genuine])),
+        sum(match for match, _ in impostor) / len(impostor),
+    )
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Stored bytes, fetch+decode latency and match accuracy per image codec")
+    parser.add_argument("--count", type=int, default=200, help="voter photos to sample")
+    parser.add_argument("--no-verify", action="store_true", help="skip the (slow) embedding accuracy check")
+    args = parser.parse_args()
+
+    conn = db.connect()
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        photos = sample_photos(cur, args.count)
+        if not photos:
+            raise SystemExit("No voter photos to benchmark.")
+        references = None if args.no_verify else [embed(photo) for photo in photos]
+
+        for fmt, quality, face_crop in VARIANTS:
+            encoded = [image_codec.encode_photo(photo, fmt, quality, face_crop) for photo in photos]
+            p50, p95 = fetch_and_decode(cur, encoded)
+            name = f"{fmt}{'' if quality is None else f' q{quality}'}{' crop' if face_crop else ''}"
+            line = f"{name:<16} {np.mean([len(data) for data in encoded]) / 1024:7.1f} KB  fetch+decode p50={p50:.2f} ms p95={p95:.2f} ms"
+            if references is not None:
+                genuine, distance, impostor = accuracy(references, encoded)
+                line += f"  match={genuine:.1%} mean_dist={distance:.3f} false_match={impostor:.1%}"
+            print(line)
+    finally:
+        cur.execute(TEARDOWN)
+        cur.close()
+        conn.close()
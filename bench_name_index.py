@@ -0,0 +1,46 @@
+import argparse
+import random
+import time
+import numpy as np
+from name_index import NameIndex
+
+FIRST = ["Aarav", "Vihaan", "Aditya", "Sai", "Arjun", "Reyansh", "Krishna", "Ishaan", "Ananya", "Diya",
+         "Saanvi", "Aadhya", "Lakshmi", "Priya", "Kavya", "Meera", "Rahul", "Suresh", "Ramesh", "Venkat",
+         "Abhiram", "Harsha", "Srinivas", "Padma", "Swathi", "Naveen", "Kiran", "Deepika", "Manoj", "Anjali"]
+LAST = ["Reddy", "Rao", "Naidu", "Sharma", "Kumar", "Varma", "Chowdary", "Patel", "Iyer", "Nair",
+        "Gupta", "Singh", "Das", "Menon", "Pillai", "Yadav", "Joshi", "Mehta", "Bose", "Shetty"]
+
+
+def synthetic_names(count, seed):
+    rng = random.Random(seed)
+    for voter_id in range(1, count + 1):
+        name = f"{rng.choice(FIRST)} {rng.choice(LAST)} {rng.randrange(10000)}"
+        yield voter_id, name, rng.random() < 0.3
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Per-keystroke latency of the in-memory name search index")
+    parser.add_argument("--size", type=int, default=1_000_000)
+    parser.add_argument("--seed", type=int, default=0)
+    parser.add_argument("--terms", nargs="+", default=["abhiram reddy 42", "priya", "kumar 7", "venkat naidu"])
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    index = NameIndex(synthetic_names(args.size, args.seed))
+    print(f"built index over {len(index)} names in {time.perf_counter() - start:.1f} s")
+
+    timings = []
+    for term in args.terms:
+        previous = None
+        for length in range(1, len(term) + 1):
+            typed = term[:length]
+            start = time.perf_counter()
+            positions = index.search(typed, previous)
+            elapsed = (time.perf_counter() - start) * 1000
+            previous = (typed, positions)
+            timings.append(elapsed)
+            print(f"  {typed!r:<22} {len(positions):>8} matches  {elapsed:6.2f} ms")
+
+    timings = np.array(timings)
+    print(f"per keystroke: p50={np.percentile(timings, 50):.2f} ms  "
+          f"p95={np.percentile(timings, 95):.2f} ms  max={timings.max():.2f} ms")
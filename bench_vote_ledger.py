@@ -0,0 +1,91 @@
+import argparse
+import random
+import threading
+import time
+import db
+
+# Scratch tables so the comparison never touches the real roll or results.
+SETUP = """
+    DROP TABLE IF EXISTS bench_counter, bench_ledger, bench_tally;
+    CREATE TABLE bench_counter (party_id INTEGER PRIMARY KEY, votes INTEGER NOT NULL DEFAULT 0);
+    INSERT INTO bench_counter (party_id) SELECT generate_series(1, %(parties)s);
+    CREATE TABLE bench_ledger (
+        id BIGSERIAL PRIMARY KEY,
+        voter_id INTEGER NOT NULL UNIQUE,
+        party_id INTEGER NOT NULL,
+        booth_id VARCHAR(50) NOT NULL,
+        cast_at TIMESTAMPTZ NOT NULL DEFAULT now()
+    );
+    CREATE TABLE bench_tally (
+        party_id INTEGER NOT NULL,
+        booth_id VARCHAR(50) NOT NULL,
+        votes BIGINT NOT NULL DEFAULT 0,
+        PRIMARY KEY (party_id, booth_id)
+    );
+"""
+TEARDOWN = "DROP TABLE IF EXISTS bench_counter, bench_ledger, bench_tally"
+
+COUNTER = "UPDATE bench_counter SET votes = votes + 1 WHERE party_id = %s"
+LEDGER = """
+    WITH ballot AS (
+        INSERT INTO bench_ledger (voter_id, party_id, booth_id) VALUES (%s, %s, %s)
+    )
+    INSERT INTO bench_tally (party_id, booth_id, votes) VALUES (%s, %s, 1)
+    ON CONFLICT (party_id, booth_id) DO UPDATE SET votes = bench_tally.votes + 1
+"""
+
+
+def booth(mode, booth_no, booths, votes, parties, start_gate):
+    rng = random.Random(booth_no)
+    booth_id = f"booth-{booth_no}"
+    conn = db.connect()
+    cur = conn.cursor()
+    start_gate.wait()
+    for n in range(votes):
+        party_id = rng.randint(1, parties)
+        if mode == "counter":
+            cur.execute(COUNTER, (party_id,))
+        else:
+            voter_id = n * booths + booth_no
+            cur.execute(LEDGER, (voter_id, party_id, booth_id, party_id, booth_id))
+        conn.commit()
+    cur.close()
+    conn.close()
+
+
+def run(mode, booths, votes, parties):
+    start_gate = threading.Barrier(booths + 1)
+    threads = [
+        threading.Thread(target=booth, args=(mode, n, booths, votes, parties, start_gate))
+        for n in range(booths)
+    ]
+    for thread in threads:
+        thread.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    return booths * votes / (time.perf_counter() - started)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Commit throughput: party counter updates vs the vote ledger")
+    parser.add_argument("--booths", type=int, nargs="+", default=[1, 8, 32, 64])
+    parser.add_argument("--votes", type=int, default=500, help="votes committed per booth")
+    parser.add_argument("--parties", type=int, default=3)
+    args = parser.parse_args()
+
+    conn = db.connect()
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        for booths in args.booths:
+            cur.execute(SETUP, {"parties": args.parties})
+            counter = run("counter", booths, args.votes, args.parties)
+            ledger = run("ledger", booths, args.votes, args.parties)
+            print(f"{booths:>3} booths  counter={counter:8.0f} commits/s  ledger={ledger:8.0f} commits/s  "
+                  f"({ledger / counter:.2f}x)")
+    finally:
+        cur.execute(TEARDOWN)
+        cur.close()
+        conn.close()
@@ -0,0 +1,101 @@
+import argparse
+import queue
+import random
+import threading
+import time
+import numpy as np
+import db
+import image_store
+import voting
+from keypad import KeypadReader, ScriptedKeypad
+
+PARTY_NAME = "load-test"
+
+
+def seed(voters, parties):
+    with db.cursor() as cur:
+        digest = image_store.store_image(cur, b"load-test")
+        cur.execute(
+            "INSERT INTO party (party_name) SELECT %s || n FROM generate_series(1, %s) AS n RETURNING id",
+            (PARTY_NAME, parties)
+        )
+        party_ids = [row[0] for row in cur.fetchall()]
+        cur.execute(
+            """
+            INSERT INTO voters (name, image_hash)
+            SELECT 'load-test ' || n, %s FROM generate_series(1, %s) AS n
+            RETURNING id
+            """,
+            (digest, voters)
+        )
+        voter_ids = [row[0] for row in cur.fetchall()]
+    return party_ids, voter_ids
+
+
+def cleanup(party_ids, voter_ids):
+    with db.cursor() as cur:
+        cur.execute("DELETE FROM votes WHERE voter_id = ANY(%s)", (voter_ids,))
+        cur.execute("DELETE FROM voters WHERE id = ANY(%s)", (voter_ids,))
+        cur.execute("DELETE FROM party WHERE id = ANY(%s)", (party_ids,))
+
+
+def run_booth(booth_no, voter_ids, key_to_party, latencies, outcomes):
+    # Drives the same path as the booth UI: a keypad backend feeding a
+    # KeypadReader, whose keys are applied to one VoteSession per voter.
+    rng = random.Random(booth_no)
+    backend = ScriptedKeypad(timeout=0.1)
+    events = queue.Queue()
+    reader = KeypadReader(backend, events.put)
+    reader.start()
+    keys = list(key_to_party)
+
+    try:
+        for voter_id in voter_ids:
+            session = voting.VoteSession(voter_id, key_to_party=key_to_party)
+            pressed = time.perf_counter()
+            backend.press(rng.choice(keys))
+            while not session.finished:
+                try:
+                    session.on_key(events.get(timeout=1.0))
+                except queue.Empty:
+                    session.check_timeout()
+            latencies.append((time.perf_counter() - pressed) * 1000)
+            outcomes.append(session.state)
+    finally:
+        reader.stop()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Drive simulated keypad votes through the voting flow with no hardware")
+    parser.add_argument("--voters", type=int, default=5000)
+    parser.add_argument("--booths", type=int, default=8)
+    parser.add_argument("--parties", type=int, default=3)
+    args = parser.parse_args()
+
+    party_ids, voter_ids = seed(args.voters, args.parties)
+    key_to_party = {str(n + 1): party_id for n, party_id in enumerate(party_ids)}
+    latencies = []
+    outcomes = []
+
+    try:
+        threads = [
+            threading.Thread(target=run_booth, args=(n, voter_ids[n::args.booths], key_to_party, latencies, outcomes))
+            for n in range(args.booths)
+        ]
+        started = time.perf_counter()
+        for thread in threads:
+            thread.start()
+        for thread in threads:
+            thread.join()
+        elapsed = time.perf_counter() - started
+    finally:
+        cleanup(party_ids, voter_ids)
+
+    latencies = np.array(latencies)
+    committed = outcomes.count(voting.COMMITTED)
+    print(f"{len(outcomes)} voters through {args.booths} booths in {elapsed:.2f} s: "
+          f"{committed / elapsed * 60:.0f} votes/min")
+    print(f"key press to commit: p50={np.percentile(latencies, 50):.2f} ms  "
+          f"p95={np.percentile(latencies, 95):.2f} ms  p99={np.percentile(latencies, 99):.2f} ms")
+    for state in sorted(set(outcomes)):
+        print(f"  {state}: {outcomes.count(state)}")
@@ -0,0 +1,212 @@
+import argparse
+import os
+import sqlite3
+import threading
+import traceback
+import uuid
+from datetime import datetime, timezone
+import psycopg2
+import db
+from voting import BOOTH_ID
+
+STORE_PATH = os.environ.get("EVM_BOOTH_STORE", "booth_votes.db")
+SYNC_BATCH = 500
+SYNC_INTERVAL = 2.0
+MAX_BACKOFF = 60.0
+
+# Central outcomes that mean the ballot was not counted there.
+CONFLICTS = ("already_voted", "rejected")
+
+
+class BoothStore:
+    # Booth-local ballot box in SQLite (WAL, synchronous=FULL). A vote is
+    # durable once record_vote returns, whether or not Postgres is reachable.
+    # sync_state stays NULL until the central database has answered for it.
+    def __init__(self, path=STORE_PATH, booth_id=BOOTH_ID):
+        self.booth_id = booth_id
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=FULL")
+        with self.conn:
+            self.conn.execute("""
+                CREATE TABLE IF NOT EXISTS local_votes (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    vote_uuid TEXT NOT NULL UNIQUE,
+                    voter_id INTEGER NOT NULL UNIQUE,
+                    party_id INTEGER NOT NULL,
+                    booth_id TEXT NOT NULL,
+                    cast_at TEXT NOT NULL,
+                    sync_state TEXT,
+                    synced_at TEXT
+                )
+            """)
+            self.conn.execute(
+                "CREATE INDEX IF NOT EXISTS local_votes_pending ON local_votes (seq) WHERE sync_state IS NULL"
+            )
+
+    def record_vote(self, voter_id, party_id):
+        # False if this booth already holds a ballot for the voter.
+        cast_at = datetime.now(timezone.utc).isoformat()
+        try:
+            with self.lock, self.conn:
+                self.conn.execute(
+                    "INSERT INTO local_votes (vote_uuid, voter_id, party_id, booth_id, cast_at) VALUES (?, ?, ?, ?, ?)",
+                    (str(uuid.uuid4()), voter_id, party_id, self.booth_id, cast_at)
+                )
+        except sqlite3.IntegrityError:
+            return False
+        return True
+
+    def has_voted(self, voter_id):
+        with self.lock:
+            row = self.conn.execute("SELECT 1 FROM local_votes WHERE voter_id = ?", (voter_id,)).fetchone()
+        return row is not None
+
+    def pending(self, limit=SYNC_BATCH):
+        with self.lock:
+            return self.conn.execute(
+                """
+                SELECT vote_uuid, voter_id, party_id, booth_id, cast_at FROM local_votes
+                WHERE sync_state IS NULL ORDER BY seq LIMIT ?
+                """,
+                (limit,)
+            ).fetchall()
+
+    def pending_count(self):
+        with self.lock:
+            return self.conn.execute("SELECT count(*) FROM local_votes WHERE sync_state IS NULL").fetchone()[0]
+
+    def mark_synced(self, outcomes):
+        synced_at = datetime.now(timezone.utc).isoformat()
+        with self.lock, self.conn:
+            self.conn.executemany(
+                "UPDATE local_votes SET sync_state = ?, synced_at = ? WHERE vote_uuid = ?",
+                [(state, synced_at, vote_uuid) for vote_uuid, state in outcomes]
+            )
+
+    def conflicts(self):
+        with self.lock:
+            return self.conn.execute(
+                f"""
+                SELECT vote_uuid, voter_id, party_id, cast_at, sync_state FROM local_votes
+                WHERE sync_state IN ({', '.join('?' * len(CONFLICTS))}) ORDER BY seq
+                """,
+                CONFLICTS
+            ).fetchall()
+
+    def retry(self, vote_uuids):
+        # Puts conflicted ballots back in the queue once the cause is fixed
+        # centrally (a restored party, a voter reinstated on the roll).
+        with self.lock, self.conn:
+            cur = self.conn.executemany(
+                f"""
+                UPDATE local_votes SET sync_state = NULL, synced_at = NULL
+                WHERE vote_uuid = ? AND sync_state IN ({', '.join('?' * len(CONFLICTS))})
+                """,
+                [(vote_uuid,) + CONFLICTS for vote_uuid in vote_uuids]
+            )
+            return cur.rowcount
+
+    def close(self):
+        with self.lock:
+            self.conn.close()
+
+
+def push_batch(cur, batch):
+    # One round trip per batch; returns [(vote_uuid, outcome), ...].
+    columns = list(zip(*batch))
+    db.execute(cur, "sync_votes", tuple(list(column) for column in columns))
+    return cur.fetchall()
+
+
+class SyncWorker:
+    # Uploads pending ballots in batches. While the central database is down
+    # it backs off exponentially; the booth keeps voting into the local store.
+    def __init__(self, store, batch_size=SYNC_BATCH, interval=SYNC_INTERVAL, on_conflict=None):
+        self.store = store
+        self.batch_size = batch_size
+        self.interval = interval
+        self.on_conflict = on_conflict
+        self.last_error = None
+        self._wake = threading.Event()
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+        self._wake.set()
+        if self._thread is not None:
+            self._thread.join(timeout=5)
+
+    def wake(self):
+        self._wake.set()
+
+    def sync_once(self):
+        batch = self.store.pending(self.batch_size)
+        if not batch:
+            return 0
+
+        with db.cursor() as cur:
+            outcomes = push_batch(cur, batch)
+        # Marked only after the central commit: a crash in between re-sends
+        # the batch, which the server then reports as duplicates.
+        self.store.mark_synced(outcomes)
+
+        for vote_uuid, state in outcomes:
+            if state in CONFLICTS:
+                voter_id = next(row[1] for row in batch if row[0] == vote_uuid)
+                print(f"Sync conflict: ballot {vote_uuid} for voter {voter_id} was {state} centrally.")
+                if self.on_conflict is not None:
+                    self.on_conflict(vote_uuid, voter_id, state)
+        return len(batch)
+
+    def _run(self):
+        delay = self.interval
+        while self._running.is_set():
+            try:
+                synced = self.sync_once()
+                self.last_error = None
+                delay = self.interval
+                if synced == self.batch_size:
+                    continue
+            except psycopg2.Error as e:
+                self.last_error = e
+                delay = min(delay * 2, MAX_BACKOFF)
+            except Exception as e:
+                # Anything else is a bug, but the ballots are safe locally:
+                # report it and keep the worker alive.
+                self.last_error = e
+                traceback.print_exc()
+                delay = min(delay * 2, MAX_BACKOFF)
+
+            self._wake.wait(delay)
+            self._wake.clear()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Review ballots the central database did not count")
+    parser.add_argument("--store", default=STORE_PATH)
+    parser.add_argument("--retry", nargs="+", metavar="VOTE_UUID", help="queue these conflicted ballots for sync again")
+    parser.add_argument("--retry-rejected", action="store_true", help="queue every rejected ballot for sync again")
+    args = parser.parse_args()
+
+    store = BoothStore(args.store)
+    try:
+        conflicts = store.conflicts()
+        if args.retry or args.retry_rejected:
+            vote_uuids = list(args.retry or [])
+            if args.retry_rejected:
+                vote_uuids += [row[0] for row in conflicts if row[4] == "rejected"]
+            print(f"{store.retry(vote_uuids)} ballots queued for sync; the booth sends them on its next pass.")
+        else:
+            print(f"{store.pending_count()} ballots waiting to sync, {len(conflicts)} conflicts.")
+            for vote_uuid, voter_id, party_id, cast_at, state in conflicts:
+                print(f"{vote_uuid}  voter {voter_id}  party {party_id}  cast {cast_at}  {state}")
+    finally:
+        store.close()
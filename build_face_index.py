@@ -0,0 +1,47 @@
+import argparse
+import os
+import psycopg2
+import db
+import face_store
+from face_index import IVFIndex, fetch_embeddings, wait_settled_seq, INDEX_PATH
+
+
+def build_index(cur, path, model_name, nlist, nprobe):
+    watermark = wait_settled_seq(cur)
+    ids, vectors, _ = fetch_embeddings(cur, model_name)
+    if not ids:
+        print("No face embeddings found, nothing to index.")
+        return
+
+    if nlist is None:
+        nlist = max(1, min(len(ids) // 39, int(4 * len(ids) ** 0.5)))
+
+    index = IVFIndex.build(ids, vectors, nlist, model_name, nprobe, watermark)
+    index.save(path)
+    print(f"Indexed {len(index)} voters into {nlist} lists at {path}.")
+
+
+def update_index(cur, path):
+    index = IVFIndex.load(path)
+    added = index.refresh(cur)
+    index.save(path)
+    print(f"Applied {added} new or updated embeddings to {path} ({len(index)} total).")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Build or update the approximate face index used by the booth")
+    parser.add_argument("--output", default=INDEX_PATH)
+    parser.add_argument("--model", default=face_store.MODEL_NAME)
+    parser.add_argument("--nlist", type=int, default=None)
+    parser.add_argument("--nprobe", type=int, default=8)
+    parser.add_argument("--update", action="store_true", help="append voters enrolled since the last build")
+    args = parser.parse_args()
+
+    try:
+        with db.cursor() as cur:
+            if args.update and os.path.exists(args.output):
+                update_index(cur, args.output)
+            else:
+                build_index(cur, args.output, args.model, args.nlist, args.nprobe)
+    except psycopg2.Error as e:
+        print(f"Error building face index: {e}")
@@ -0,0 +1,50 @@
+import threading
+import time
+from collections import deque
+import cv2
+
+
+class CameraCapture:
+    def __init__(self, device=0, buffer_size=8):
+        self.device = device
+        self.frames = deque(maxlen=buffer_size)
+        self.sequence = 0
+        self._capture = None
+        self._lock = threading.Lock()
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is not None:
+            return
+        self._capture = cv2.VideoCapture(self.device)
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def _run(self):
+        while self._running.is_set():
+            ret, frame = self._capture.read()
+            if not ret:
+                time.sleep(0.05)
+                continue
+            with self._lock:
+                self.sequence += 1
+                self.frames.append((self.sequence, time.monotonic(), frame))
+
+    def latest(self):
+        with self._lock:
+            return self.frames[-1] if self.frames else None
+
+    def recent(self, since_sequence=0):
+        with self._lock:
+            return [entry for entry in self.frames if entry[0] > since_sequence]
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=1)
+            self._thread = None
+        if self._capture is not None:
+            self._capture.release()
+            self._capture = None
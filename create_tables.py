@@ -1,58 +1,31 @@
 import psycopg2
+import db
+import migrate
 from psycopg2 import sql
 from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT
 
 def create_database():
     try:
-        conn = psycopg2.connect(
-            dbname="postgres",
-            user="postgres",
-            password="12345678",
-            host="localhost"
-        )
+        target = db.load_config()["dbname"]
+        conn = db.connect(dbname="postgres")
         conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
         cur = conn.cursor()
 
         cur.execute(sql.SQL("CREATE DATABASE {}").format(
-            sql.Identifier('evm_face')
+            sql.Identifier(target)
         ))
 
         cur.close()
         conn.close()
-        print("Database 'evm_face' created successfully.")
+        print(f"Database '{target}' created successfully.")
     except psycopg2.Error as e:
         print(f"Error creating database: {e}")
 
 def create_tables():
+    # The schema lives in migrations/; running them on a fresh database
+    # creates every table and index.
     try:
-        conn = psycopg2.connect(
-            dbname="evm_face",
-            user="postgres",
-            password="12345678",
-            host="localhost"
-        )
-        cur = conn.cursor()
-
-        cur.execute("""
-            CREATE TABLE voters (
-                id SERIAL PRIMARY KEY,
-                name VARCHAR(100) NOT NULL,
-                image BYTEA NOT NULL,
-                vote_status BOOLEAN DEFAULT FALSE
-            )
-        """)
-
-        cur.execute("""
-            CREATE TABLE party (
-                id SERIAL PRIMARY KEY,
-                party_name VARCHAR(100) NOT NULL,
-                votes INTEGER DEFAULT 0
-            )
-        """)
-
-        conn.commit()
-        cur.close()
-        conn.close()
+        migrate.migrate()
         print("Tables created successfully.")
     except psycopg2.Error as e:
         print(f"Error creating tables: {e}")
@@ -0,0 +1,200 @@
+import configparser
+import io
+import os
+import re
+import threading
+from contextlib import contextmanager
+import psycopg2
+from psycopg2 import pool
+from psycopg2.extensions import connection as _connection
+
+CONFIG_PATH = os.environ.get("EVM_DB_CONFIG", "evm_db.ini")
+
+DEFAULTS = {
+    "host": "localhost",
+    "port": "5432",
+    "dbname": "evm_face",
+    "user": "postgres",
+    "password": "12345678",
+    "pool_min": "1",
+    "pool_max": "8",
+}
+
+ENV_VARS = {
+    "host": "EVM_DB_HOST",
+    "port": "EVM_DB_PORT",
+    "dbname": "EVM_DB_NAME",
+    "user": "EVM_DB_USER",
+    "password": "EVM_DB_PASSWORD",
+    "pool_min": "EVM_DB_POOL_MIN",
+    "pool_max": "EVM_DB_POOL_MAX",
+}
+
+# Queries on the booth's hot paths. They are PREPAREd once per pooled
+# connection and then run with EXECUTE, so Postgres skips parse/plan.
+HOT_QUERIES = {
+    "count_voters": "SELECT count(*) FROM voters",
+    # The planner's row estimate, scaled to the table's current size; -1 if
+    # voters has never been analyzed.
+    "estimate_voters": """
+        SELECT CASE WHEN reltuples >= 0 AND relpages > 0
+            THEN (reltuples / relpages * (pg_relation_size(oid) / current_setting('block_size')::int))::bigint
+            ELSE -1 END
+        FROM pg_class WHERE oid = 'voters'::regclass
+    """,
+    "voter_page": "SELECT id, name, vote_status FROM voters WHERE id > $1 ORDER BY id LIMIT $2",
+    "voter_id_at": "SELECT id FROM voters ORDER BY id OFFSET $1 LIMIT 1",
+    "voter_id_before": "SELECT id FROM voters WHERE id <= $1 ORDER BY id DESC OFFSET $2 LIMIT 1",
+    "last_voter_id": "SELECT coalesce(max(id), 0) FROM voters",
+    "voter_locate": """
+        SELECT (SELECT max(id) FROM voters WHERE id < $1), (SELECT min(id) FROM voters), (SELECT max(id) FROM voters)
+        FROM voters WHERE id = $1
+    """,
+    "search_voters": "SELECT id, name, vote_status FROM voters WHERE LOWER(name) LIKE $1 ORDER BY id",
+    "voter_image": """
+        SELECT b.data, v.vote_status FROM voters v
+        JOIN image_blobs b ON b.sha256 = v.image_hash
+        WHERE v.id = $1
+    """,
+    "voter_thumbnail": """
+        SELECT t.image, v.vote_status FROM voters v
+        LEFT JOIN voter_thumbnails t ON t.voter_id = v.id AND t.size = $2
+        WHERE v.id = $1
+    """,
+    "voter_status": "SELECT vote_status FROM voters WHERE id = $1",
+    "voter_embedding": "SELECT embedding FROM face_embeddings WHERE voter_id = $1 AND model_name = $2",
+    "cast_vote": "SELECT cast_vote($1, $2, $3)",
+    "sync_votes": """
+        SELECT u, sync_vote(u::uuid, v, p, b, t::timestamptz)
+        FROM unnest($1::text[], $2::int[], $3::int[], $4::text[], $5::text[]) AS s(u, v, p, b, t)
+    """,
+    "count_not_voted": "SELECT count(*) FROM voters WHERE vote_status = FALSE",
+    "results": "SELECT party_name, votes FROM party_results ORDER BY votes DESC",
+}
+
+_pool = None
+_pool_lock = threading.Lock()
+
+
+class PreparedConnection(_connection):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self.prepared = set()
+
+
+def load_config():
+    config = dict(DEFAULTS)
+
+    parser = configparser.ConfigParser()
+    if parser.read(CONFIG_PATH) and parser.has_section("database"):
+        config.update(parser["database"])
+
+    for key, env_var in ENV_VARS.items():
+        if env_var in os.environ:
+            config[key] = os.environ[env_var]
+
+    return config
+
+
+def connection_params(**overrides):
+    config = load_config()
+    params = {key: config[key] for key in ("host", "port", "dbname", "user", "password")}
+    params.update(overrides)
+    return params
+
+
+def connect(**overrides):
+    # A dedicated connection outside the pool, e.g. for LISTEN or CREATE DATABASE.
+    return psycopg2.connect(**connection_params(**overrides))
+
+
+def get_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is None:
+            config = load_config()
+            _pool = pool.ThreadedConnectionPool(
+                int(config["pool_min"]),
+                int(config["pool_max"]),
+                connection_factory=PreparedConnection,
+                **connection_params()
+            )
+        return _pool
+
+
+@contextmanager
+def connection():
+    db_pool = get_pool()
+    conn = db_pool.getconn()
+    try:
+        yield conn
+        conn.commit()
+    except Exception:
+        if not conn.closed:
+            conn.rollback()
+        raise
+    finally:
+        db_pool.putconn(conn, close=bool(conn.closed))
+
+
+@contextmanager
+def cursor():
+    with connection() as conn:
+        with conn.cursor() as cur:
+            yield cur
+
+
+def unprepared(name, params=()):
+    # A hot query with $n placeholders as SQL and parameters for
+    # cur.execute. $n is bound by number, so a query may use a parameter
+    # twice or out of order.
+    sql = re.sub(r"\$(\d+)", lambda m: f"%(p{m.group(1)})s", HOT_QUERIES[name])
+    return sql, {f"p{n}": value for n, value in enumerate(params, 1)}
+
+
+def execute(cur, name, params=()):
+    conn = cur.connection
+    prepared = getattr(conn, "prepared", None)
+
+    if prepared is None:
+        # Plain connection from connect(): run the query unprepared.
+        cur.execute(*unprepared(name, params))
+        return
+
+    if name not in prepared:
+        cur.execute(f"PREPARE {name} AS {HOT_QUERIES[name]}")
+        prepared.add(name)
+
+    if params:
+        cur.execute(f"EXECUTE {name} ({', '.join(['%s'] * len(params))})", params)
+    else:
+        cur.execute(f"EXECUTE {name}")
+
+
+def _copy_value(value):
+    if value is None:
+        return "\\N"
+    if isinstance(value, (bytes, bytearray, memoryview)):
+        return "\\\\x" + bytes(value).hex()
+    text = str(value)
+    for char, escaped in (("\\", "\\\\"), ("\t", "\\t"), ("\n", "\\n"), ("\r", "\\r")):
+        text = text.replace(char, escaped)
+    return text
+
+
+def copy_rows(cur, table, columns, rows):
+    # Loads rows with COPY ... FROM STDIN in text format; bytes become bytea.
+    buffer = io.StringIO()
+    for row in rows:
+        buffer.write("\t".join(_copy_value(value) for value in row))
+        buffer.write("\n")
+    buffer.seek(0)
+    cur.copy_expert(f"COPY {table} ({', '.join(columns)}) FROM STDIN", buffer)
+
+
+def close_pool():
+    global _pool
+    with _pool_lock:
+        if _pool is not None:
+            _pool.closeall()
+            _pool = None
@@ -1,8 +1,9 @@
 import tkinter as tk
 from tkinter import ttk
 import psycopg2
-from PIL import Image, ImageTk
-import io
+import db
+import thumbnails
+from PIL import ImageTk
 
 class VoterDisplayApp(tk.Tk):
     def __init__(self):
@@ -20,6 +21,7 @@ class VoterDisplayApp(tk.Tk):
         self.style.configure("Treeview", font=("Helvetica", 11))
         self.style.configure("Treeview.Heading", font=("Helvetica", 12, "bold"))
 
+        self.image_cache = thumbnails.LRUCache(256)
         self.create_widgets()
         self.load_voters()
 
@@ -49,23 +51,13 @@ class VoterDisplayApp(tk.Tk):
 
     def load_voters(self):
         try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
-
-            cur.execute("SELECT id, name FROM voters ORDER BY id")
-            voters = cur.fetchall()
+            with db.cursor() as cur:
+                cur.execute("SELECT id, name FROM voters ORDER BY id")
+                voters = cur.fetchall()
 
             for voter in voters:
                 self.tree.insert("", tk.END, values=voter)
 
-            cur.close()
-            conn.close()
-
         except psycopg2.Error as e:
             print(f"Error loading voters: {e}")
 
@@ -74,24 +66,18 @@ class VoterDisplayApp(tk.Tk):
         voter_id = self.tree.item(selected_item)['values'][0]
 
         try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
-
-            cur.execute("SELECT image FROM voters WHERE id = %s", (voter_id,))
-            image_data = cur.fetchone()[0]
-
-            cur.close()
-            conn.close()
-
-            # Convert binary data to image
-            image = Image.open(io.BytesIO(image_data))
-            image = image.resize((300, 225))  # Resize for display
-            photo = ImageTk.PhotoImage(image)
+            photo = self.image_cache.get(voter_id)
+            if photo is None:
+                with db.cursor() as cur:
+                    image, _ = thumbnails.load_thumbnail(cur, voter_id, "display")
+                if image is None:
+                    # Deleted since the list was loaded.
+                    print(f"Voter {voter_id} is no longer on the roll")
+                    self.image_label.config(image='')
+                    self.image_label.image = None
+                    return
+                photo = ImageTk.PhotoImage(image)
+                self.image_cache.put(voter_id, photo)
 
             self.image_label.config(image=photo)
             self.image_label.image = photo  # Keep a reference
@@ -5,8 +5,24 @@ import cv2
 import numpy as np
 from PIL import Image, ImageTk
 import io
+import os
+import queue
+import threading
 import serial
-from deepface import DeepFace
+from concurrent.futures import ThreadPoolExecutor
+import db
+import face_store
+import thumbnails
+import voting
+from face_model import FaceModelManager
+from camera import CameraCapture
+from keypad import KeypadReader, open_keypad
+from voter_list import VirtualVoterList, DbVoterSource, ListVoterSource
+from name_index import NameIndex, IndexVoterSource
+from results_dashboard import ResultsDashboard
+from booth_store import BoothStore, SyncWorker
+import face_quality
+from face_index import ExactIndex, IVFIndex, INDEX_PATH
 
 class EVMApp(tk.Tk):
     def __init__(self):
@@ -25,16 +41,64 @@ class EVMApp(tk.Tk):
         self.style.configure("Treeview", font=("Helvetica", 11))
         self.style.configure("Treeview.Heading", font=("Helvetica", 12, "bold"))
 
+        # All state exists before the widgets, the after() loops or any
+        # dialog that could run the event loop and reach a handler.
+        self.face_model = FaceModelManager()
+        self.voter_ready = False
+        self.executor = ThreadPoolExecutor(max_workers=1)
+        self.results_queue = queue.Queue()
+        self.job_counter = 0
+        self.active_job = None
+        self.name_index = None
+        self.face_index = ExactIndex()
+        self.face_index_ready = False
+        self.search_job = None
+        self.last_search = None
+        self.image_cache = thumbnails.LRUCache(256)
+        self.current_voter_id = None
+        self.current_voter_name = None
+
+        self.booth_store = BoothStore()
+        self.sync_worker = SyncWorker(
+            self.booth_store,
+            on_conflict=lambda vote_uuid, voter_id, state: self.results_queue.put(
+                (None, self.on_sync_conflict, (voter_id, state), None)
+            )
+        )
+
+        self.keypad_events = queue.Queue()
+        self.vote_session = None
+        self.vote_window = None
+        self.keypad = None
+
+        self.camera = CameraCapture(0)
+        self.camera_active = False
+        self.shown_frame = None
+        self.face_gate = face_quality.FacePresenceGate()
+        self.gate_open = False
+
         self.create_widgets()
+        self.camera.start()
+        self.sync_worker.start()
+        self.face_model.start_warmup()
         self.load_voters()
+        threading.Thread(target=self.build_name_index, daemon=True).start()
+        threading.Thread(target=self.load_face_index, daemon=True).start()
+        self.poll_results()
+        self.check_model_ready()
 
         try:
-            self.arduino = serial.Serial('COM4', 9600, timeout=1)
-        except:
+            self.arduino = open_keypad()
+            self.keypad = KeypadReader(
+                self.arduino,
+                on_key=lambda key: self.keypad_events.put(("key", key)),
+                on_error=lambda e: self.keypad_events.put(("error", e))
+            )
+            self.keypad.start()
+        except (serial.SerialException, OSError, ValueError):
+            self.keypad = None
             messagebox.showerror("Error", "Could not connect to Arduino")
-
-        self.camera = cv2.VideoCapture(0)
-        self.camera_active = False
+        self.poll_keypad()
 
     def create_widgets(self):
         main_frame = ttk.Frame(self, padding="20 20 20 20")
@@ -56,119 +120,204 @@ class EVMApp(tk.Tk):
         search_label.pack(side=tk.LEFT, padx=(0, 10))
 
         self.search_var = tk.StringVar()
-        self.search_var.trace("w", self.search_voters)
+        self.search_var.trace("w", self.on_search_changed)
         search_entry = ttk.Entry(search_frame, textvariable=self.search_var, width=40)
         search_entry.pack(side=tk.LEFT, expand=True, fill=tk.X)
 
-        self.tree = ttk.Treeview(left_frame, columns=("ID", "Name", "Status"), show="headings")
-        self.tree.heading("ID", text="ID")
-        self.tree.heading("Name", text="Name")
-        self.tree.heading("Status", text="Status")
-        self.tree.column("ID", width=50, anchor=tk.CENTER)
-        self.tree.column("Name", width=200, anchor=tk.W)
-        self.tree.column("Status", width=100, anchor=tk.CENTER)
-        self.tree.pack(expand=True, fill=tk.BOTH)
-
-        scrollbar = ttk.Scrollbar(left_frame, orient=tk.VERTICAL, command=self.tree.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.tree.configure(yscrollcommand=scrollbar.set)
-
-        self.tree.bind("<<TreeviewSelect>>", self.on_voter_select)
+        self.voter_list = VirtualVoterList(left_frame, on_select=self.on_voter_select)
+        self.voter_list.pack(expand=True, fill=tk.BOTH)
 
         self.db_image_label = ttk.Label(right_frame)
         self.db_image_label.pack(pady=20)
 
         self.camera_label = ttk.Label(right_frame)
-        self.camera_label.pack(pady=20)
+        self.camera_label.pack(pady=(20, 5))
+
+        self.face_status_label = ttk.Label(right_frame, text="")
+        self.face_status_label.pack(pady=(0, 10))
 
-        self.verify_button = ttk.Button(right_frame, text="Verify Face", command=self.verify_face)
+        self.verify_button = ttk.Button(right_frame, text="Verify Face (loading model...)", command=self.verify_face)
         self.verify_button.pack(pady=10)
         self.verify_button.state(['disabled'])
 
+        self.multi_frame_var = tk.BooleanVar(value=True)
+        multi_frame_check = ttk.Checkbutton(right_frame, text="Multi-frame verification", variable=self.multi_frame_var)
+        multi_frame_check.pack()
+
+        self.auto_verify_var = tk.BooleanVar(value=False)
+        auto_verify_check = ttk.Checkbutton(right_frame, text="Verify automatically when face is steady", variable=self.auto_verify_var)
+        auto_verify_check.pack()
+
+        self.busy_bar = ttk.Progressbar(right_frame, mode="indeterminate", length=200)
+        self.cancel_button = ttk.Button(right_frame, text="Cancel", command=self.cancel_job)
+
+        self.identify_button = ttk.Button(right_frame, text="Identify Voter", command=self.identify_voter)
+        self.identify_button.pack(pady=10)
+        self.identify_button.state(['disabled'])
+
+        self.live_results_button = ttk.Button(right_frame, text="Live Results", command=lambda: ResultsDashboard(self))
+        self.live_results_button.pack(pady=10)
+
         self.end_voting_button = ttk.Button(right_frame, text="End Voting", command=self.show_results)
         self.end_voting_button.pack(pady=10)
 
-    def load_voters(self):
-        try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
-
-            cur.execute("SELECT id, name, vote_status FROM voters ORDER BY id")
-            voters = cur.fetchall()
+    def check_model_ready(self):
+        if not self.face_model.ready.is_set():
+            self.after(200, self.check_model_ready)
+            return
+
+        if self.face_model.is_ready():
+            self.verify_button.config(text="Verify Face (ready)")
+        else:
+            self.verify_button.config(text="Verify Face (model error)")
+            messagebox.showerror("Error", f"Could not load face model: {self.face_model.error}")
+        self.refresh_buttons()
+
+    def refresh_buttons(self):
+        idle = self.face_model.is_ready() and self.active_job is None
+
+        # No second verification while a vote prompt is open.
+        if self.voter_ready and idle and self.gate_open and self.vote_window is None:
+            self.verify_button.state(['!disabled'])
+        else:
+            self.verify_button.state(['disabled'])
 
-            for voter in voters:
-                status = "Voted" if voter[2] else "Not Voted"
-                self.tree.insert("", tk.END, values=(voter[0], voter[1], status))
+        if idle and self.face_index_ready:
+            self.identify_button.state(['!disabled'])
+        else:
+            self.identify_button.state(['disabled'])
 
-            cur.close()
-            conn.close()
+    def load_voters(self):
+        try:
+            self.voter_list.set_source(DbVoterSource())
 
         except psycopg2.Error as e:
             messagebox.showerror("Error", f"Error loading voters: {e}")
 
-    def search_voters(self, *args):
+    def load_face_index(self):
+        # Runs on its own thread: a large roll takes a while to pull in (see
+        # face_index for the memory it needs). Identify stays disabled until then.
+        try:
+            with db.cursor() as cur:
+                if os.path.exists(INDEX_PATH):
+                    index = IVFIndex.load(INDEX_PATH)
+                    index.refresh(cur)
+                else:
+                    index = ExactIndex.from_db(cur)
+            error = None
+        except Exception as e:
+            index, error = None, e
+        self.results_queue.put((None, self.on_face_index_loaded, index, error))
+
+    def on_face_index_loaded(self, index, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Error loading face embeddings: {error}")
+        else:
+            self.face_index = index
+        self.face_index_ready = True
+        self.refresh_buttons()
+        self.after(60000, self.refresh_face_index)
+
+    def refresh_face_index(self):
+        # Picks up voters enrolled by register_voter.py since the index was
+        # loaded. Runs on its own thread; the index swaps changes in under its lock.
+        threading.Thread(target=self.refresh_face_index_job, daemon=True).start()
+
+    def refresh_face_index_job(self):
+        try:
+            with db.cursor() as cur:
+                self.face_index.refresh(cur)
+        except psycopg2.Error:
+            pass
+        self.results_queue.put((None, self.schedule_face_index_refresh, None, None))
+
+    def schedule_face_index_refresh(self, result, error):
+        self.after(60000, self.refresh_face_index)
+
+    def build_name_index(self):
+        try:
+            with db.connection() as conn:
+                with conn.cursor(name="name_index") as cur:
+                    cur.itersize = 10000
+                    cur.execute("SELECT id, name, vote_status FROM voters ORDER BY id")
+                    self.name_index = NameIndex.from_cursor(cur)
+        except psycopg2.Error:
+            # Search keeps using the database until a later restart.
+            pass
+
+    def on_search_changed(self, *args):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+        self.search_job = self.after(120, self.search_voters)
+
+    def clear_search(self):
+        self.search_var.set("")
+        self.search_voters()
+
+    def search_voters(self):
+        if self.search_job is not None:
+            self.after_cancel(self.search_job)
+            self.search_job = None
         search_term = self.search_var.get().lower()
-        self.tree.delete(*self.tree.get_children())
 
         try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
+            if not search_term:
+                self.last_search = None
+                total = len(self.name_index) if self.name_index is not None else None
+                self.voter_list.set_source(DbVoterSource(total=total))
+                return
 
-            cur.execute("SELECT id, name, vote_status FROM voters WHERE LOWER(name) LIKE %s ORDER BY id", (f'%{search_term}%',))
-            voters = cur.fetchall()
+            if self.name_index is not None:
+                positions = self.name_index.search(search_term, self.last_search)
+                self.last_search = (search_term, positions)
+                self.voter_list.set_source(IndexVoterSource(self.name_index, positions))
+                return
 
-            for voter in voters:
-                status = "Voted" if voter[2] else "Not Voted"
-                self.tree.insert("", tk.END, values=(voter[0], voter[1], status))
+            with db.cursor() as cur:
+                db.execute(cur, "search_voters", (f'%{search_term}%',))
+                voters = cur.fetchall()
 
-            cur.close()
-            conn.close()
+            self.voter_list.set_source(ListVoterSource(voters))
 
         except psycopg2.Error as e:
             messagebox.showerror("Error", f"Error searching voters: {e}")
 
-    def on_voter_select(self, event):
-        selected_item = self.tree.selection()[0]
-        voter_id, voter_name, vote_status = self.tree.item(selected_item)['values']
+    def on_voter_select(self, voter_id, voter_name, vote_status):
+        if self.active_job is not None and voter_id != self.current_voter_id:
+            self.cancel_job()
 
         try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
-
-            cur.execute("SELECT image, vote_status FROM voters WHERE id = %s", (voter_id,))
-            result = cur.fetchone()
-            image_data, vote_status = result[0], result[1]
+            photo = self.image_cache.get(voter_id)
+            image = None
 
-            cur.close()
-            conn.close()
+            with db.cursor() as cur:
+                if photo is None:
+                    image, vote_status = thumbnails.load_thumbnail(cur, voter_id, "booth")
+                else:
+                    db.execute(cur, "voter_status", (voter_id,))
+                    row = cur.fetchone()
+                    vote_status = row[0] if row is not None else None
+
+            if vote_status is None:
+                # Deleted since the list was loaded.
+                self.image_cache.discard(voter_id)
+                messagebox.showerror("Error", f"Voter {voter_id} is no longer on the roll")
+                return
+            vote_status = vote_status or self.booth_store.has_voted(voter_id)
 
-            image = Image.open(io.BytesIO(image_data))
-            image = image.resize((300, 300))  
-            photo = ImageTk.PhotoImage(image)
+            if photo is None:
+                photo = ImageTk.PhotoImage(image)
+                self.image_cache.put(voter_id, photo)
 
             self.db_image_label.config(image=photo)
             self.db_image_label.image = photo 
 
+            self.voter_ready = not vote_status
+            self.refresh_buttons()
+
             if not vote_status:
-                self.verify_button.state(['!disabled'])
                 self.start_camera()
             else:
-                self.verify_button.state(['disabled'])
                 self.stop_camera()
                 messagebox.showinfo("Already Voted", f"{voter_name} has already cast their vote.")
 
@@ -178,152 +327,277 @@ class EVMApp(tk.Tk):
         except psycopg2.Error as e:
             messagebox.showerror("Error", f"Error loading voter image: {e}")
 
+    def identify_voter(self):
+        if len(self.face_index) == 0:
+            messagebox.showerror("Error", "No enrolled face embeddings to identify against")
+            return
+
+        if not self.camera_active:
+            self.start_camera()
+
+        frame = self.current_frame()
+        if frame is None:
+            messagebox.showerror("Error", "Failed to capture image from camera")
+            return
+
+        self.run_in_background(self.identify_job, self.on_identify_done, frame)
+
+    def identify_job(self, frame):
+        return self.face_index.best_match(self.face_model.embed(frame))
+
+    def on_identify_done(self, match, error):
+        if error is not None:
+            messagebox.showerror("Error", f"Face identification error: {error}")
+            return
+
+        if match is None:
+            messagebox.showerror("Error", "No matching voter found")
+            return
+
+        voter_id = match[0]
+        if self.voter_list.select_voter(voter_id):
+            return
+        if self.search_var.get():
+            self.clear_search()
+            if self.voter_list.select_voter(voter_id):
+                return
+        messagebox.showerror("Error", f"Matched voter {voter_id} is not on this roll")
+
+    def run_in_background(self, job, on_done, *args):
+        self.job_counter += 1
+        job_id = self.job_counter
+        self.active_job = job_id
+        self.busy_bar.pack(pady=5)
+        self.cancel_button.pack(pady=5)
+        self.busy_bar.start(10)
+        self.refresh_buttons()
+
+        def worker():
+            try:
+                result, error = job(*args), None
+            except Exception as e:
+                result, error = None, e
+            self.results_queue.put((job_id, on_done, result, error))
+
+        self.executor.submit(worker)
+
+    def poll_results(self):
+        try:
+            while True:
+                job_id, on_done, result, error = self.results_queue.get_nowait()
+                if job_id is None:
+                    # A notice from a background worker, not a job result.
+                    on_done(result, error)
+                    continue
+                if job_id != self.active_job:
+                    continue
+                self.end_busy()
+                self.refresh_buttons()
+                on_done(result, error)
+        except queue.Empty:
+            pass
+        self.after(50, self.poll_results)
+
+    def on_sync_conflict(self, result, error):
+        voter_id, state = result
+        reason = "had already voted at another booth" if state == "already_voted" else "was rejected"
+        messagebox.showwarning(
+            "Vote Sync Conflict",
+            f"The ballot recorded here for voter {voter_id} {reason} when it reached the central database. "
+            f"It is kept in the booth store; review it with: python booth_store.py"
+        )
+
+    def cancel_job(self):
+        # Inference can't be interrupted mid-call, so the result is simply dropped when it lands.
+        self.end_busy()
+        self.refresh_buttons()
+
+    def end_busy(self):
+        self.active_job = None
+        self.busy_bar.stop()
+        self.busy_bar.pack_forget()
+        self.cancel_button.pack_forget()
+
     def start_camera(self):
-        self.camera_active = True
-        self.update_camera()
+        if not self.camera_active:
+            self.camera_active = True
+            self.update_camera()
 
     def stop_camera(self):
         self.camera_active = False
+        self.shown_frame = None
         self.camera_label.config(image='')
+        self.face_gate.reset()
+        self.gate_open = False
+        self.face_status_label.config(text="")
 
     def update_camera(self):
         if self.camera_active:
-            ret, frame = self.camera.read()
-            if ret:
-                frame = cv2.cvtColor(frame, cv2.COLOR_BGR2RGB)
+            latest = self.camera.latest()
+            if latest is not None and latest is not self.shown_frame:
+                self.shown_frame = latest
+                frame = cv2.cvtColor(latest[2], cv2.COLOR_BGR2RGB)
                 frame = cv2.resize(frame, (300, 300))
                 photo = ImageTk.PhotoImage(image=Image.fromarray(frame))
                 self.camera_label.config(image=photo)
                 self.camera_label.image = photo
+                self.update_face_gate(latest[2])
             self.after(10, self.update_camera)
 
-    def verify_face(self):
-        try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
-
-            cur.execute("SELECT image, vote_status FROM voters WHERE id = %s", (self.current_voter_id,))
-            result = cur.fetchone()
-            db_image_data, vote_status = result[0], result[1]
-
-            cur.close()
-            conn.close()
-
-            if vote_status:
-                messagebox.showinfo("Already Voted", f"{self.current_voter_name} has already cast their vote.")
-                return
+    def update_face_gate(self, frame):
+        was_open = self.gate_open
+        self.gate_open = self.face_gate.update(face_quality.detect_faces(frame), frame.shape)
+        self.face_status_label.config(text=self.face_gate.status)
 
-            db_image = Image.open(io.BytesIO(db_image_data))
-            db_image_array = np.array(db_image)
+        if self.gate_open != was_open:
+            self.refresh_buttons()
+            if (self.gate_open and self.auto_verify_var.get() and self.voter_ready and self.active_job is None
+                    and self.vote_window is None):
+                self.verify_face()
 
-            ret, frame = self.camera.read()
+    def current_frame(self):
+        # The frame last drawn in the preview, so the face verified is the one the voter saw.
+        latest = self.shown_frame or self.camera.latest()
+        return None if latest is None else latest[2]
 
-            if not ret:
-                messagebox.showerror("Error", "Failed to capture image from camera")
-                return
-
-            try:
-                result = DeepFace.verify(db_image_array, frame, enforce_detection=False)
-                if result["verified"]:
-                    messagebox.showinfo("Success", "Face verified successfully")
-                    self.prompt_to_vote()
-                else:
-                    messagebox.showerror("Error", "Face verification failed")
-            except Exception as e:
-                messagebox.showerror("Error", f"Face verification error: {e}")
-
-        except psycopg2.Error as e:
-            messagebox.showerror("Error", f"Database error: {e}")
-
-    def prompt_to_vote(self):
+    def verify_face(self):
+        frame = self.current_frame()
+
+        if frame is None:
+            messagebox.showerror("Error", "Failed to capture image from camera")
+            return
+
+        self.run_in_background(self.verify_job, self.on_verify_done, self.current_voter_id, frame, self.multi_frame_var.get())
+
+    def verify_job(self, voter_id, frame, multi_frame):
+        with db.cursor() as cur:
+            db.execute(cur, "voter_status", (voter_id,))
+            if cur.fetchone()[0] or self.booth_store.has_voted(voter_id):
+                return voter_id, "already_voted"
+
+            stored_embedding = face_store.load_embedding(cur, voter_id)
+
+            if stored_embedding is None:
+                # Voter enrolled before embeddings existed: compute it once and keep it.
+                db.execute(cur, "voter_image", (voter_id,))
+                db_image = Image.open(io.BytesIO(cur.fetchone()[0])).convert("RGB")
+                db_image_array = cv2.cvtColor(np.array(db_image), cv2.COLOR_RGB2BGR)
+                stored_embedding = self.face_model.embed(db_image_array)
+                face_store.save_embedding(cur, voter_id, stored_embedding)
+
+        if multi_frame:
+            verified, distance = face_quality.verify_from_stream(self.camera, self.face_model, stored_embedding)
+        else:
+            verified, distance = face_store.is_match(stored_embedding, self.face_model.embed(frame))
+        return voter_id, "verified" if verified else "failed"
+
+    def on_verify_done(self, result, error):
+        if error is None and (result[0] != self.current_voter_id or self.vote_window is not None):
+            return
+        outcome = result[1] if error is None else None
+
+        if isinstance(error, psycopg2.Error):
+            messagebox.showerror("Error", f"Database error: {error}")
+        elif error is not None:
+            messagebox.showerror("Error", f"Face verification error: {error}")
+        elif outcome == "already_voted":
+            messagebox.showinfo("Already Voted", f"{self.current_voter_name} has already cast their vote.")
+        elif outcome == "verified":
+            messagebox.showinfo("Success", "Face verified successfully")
+            self.prompt_to_vote(result[0], self.current_voter_name)
+        else:
+            messagebox.showerror("Error", "Face verification failed")
+
+    def prompt_to_vote(self, voter_id, voter_name):
+        # The prompt and its session belong to the voter just verified, not
+        # to whoever is selected when the button is pressed.
         vote_window = tk.Toplevel(self)
+        self.vote_window = vote_window
+        self.refresh_buttons()
         vote_window.title("Cast Your Vote")
         vote_window.geometry("400x200")
 
-        label = ttk.Label(vote_window, text=f"Hello, {self.current_voter_name}! Please cast your vote.")
+        label = ttk.Label(vote_window, text=f"Hello, {voter_name}! Please cast your vote.")
         label.pack(pady=20)
 
-        vote_button = ttk.Button(vote_window, text="Cast Vote", command=lambda: self.cast_vote(vote_window))
+        vote_button = ttk.Button(vote_window, text="Cast Vote", command=lambda: self.cast_vote(vote_window, label, vote_button, voter_id))
         vote_button.pack()
 
-    def cast_vote(self, vote_window):
-        try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
-
-            cur.execute("SELECT vote_status FROM voters WHERE id = %s", (self.current_voter_id,))
-            vote_status = cur.fetchone()[0]
-
-            if vote_status:
-                messagebox.showinfo("Already Voted", f"{self.current_voter_name} has already cast their vote.")
-                vote_window.destroy()
-                return
-
-            messagebox.showinfo("Cast Vote", "Please press a button or enter 1, 2, or 3 on the Arduino to cast your vote.")
-            
-            vote = None
-            while vote not in [1, 2, 3]:
-                if self.arduino.in_waiting > 0:
-                    vote_str = self.arduino.readline().decode('utf-8').strip()
-                    if vote_str in ['1', '2', '3']:
-                        vote = int(vote_str)
-                
-                if vote not in [1, 2, 3]:
-                    self.update() 
-                    self.after(100)  
-
-            cur.execute("UPDATE party SET votes = votes + 1 WHERE id = %s", (vote,))
-
-            cur.execute("UPDATE voters SET vote_status = TRUE WHERE id = %s", (self.current_voter_id,))
-
-            conn.commit()
-            cur.close()
-            conn.close()
+        vote_window.protocol("WM_DELETE_WINDOW", lambda: self.end_vote_session(vote_window))
 
+    def cast_vote(self, vote_window, label, vote_button, voter_id):
+        if self.keypad is None:
+            messagebox.showerror("Error", "Could not connect to Arduino")
+            return
+
+        # Drop key presses made before the voter was invited to vote.
+        while not self.keypad_events.empty():
+            self.keypad_events.get_nowait()
+
+        self.vote_session = voting.VoteSession(voter_id, store=self.booth_store)
+        vote_button.state(['disabled'])
+        label.config(text="Please press a button or enter 1, 2, or 3 on the Arduino to cast your vote.", wraplength=360)
+
+    def poll_keypad(self):
+        while not self.keypad_events.empty():
+            kind, value = self.keypad_events.get_nowait()
+            if kind == "error":
+                messagebox.showerror("Error", f"Keypad disconnected: {value}")
+                self.keypad = None
+            elif self.vote_session is not None:
+                self.vote_session.on_key(value)
+
+        if self.vote_session is not None:
+            self.vote_session.check_timeout()
+            if self.vote_session.finished:
+                self.finish_vote_session()
+
+        self.after(20, self.poll_keypad)
+
+    def finish_vote_session(self):
+        session = self.vote_session
+        self.end_vote_session(self.vote_window)
+
+        if session.state == voting.FAILED:
+            messagebox.showerror("Error", f"Failed to cast vote: {session.error}")
+            return
+        if session.state == voting.TIMED_OUT:
+            messagebox.showerror("Error", "No vote was entered in time. Please verify again.")
+            return
+
+        if session.state == voting.COMMITTED:
+            self.sync_worker.wake()
             messagebox.showinfo("Success", "Vote cast successfully")
-            vote_window.destroy()
-            self.verify_button.state(['disabled'])
+        else:
+            messagebox.showinfo("Already Voted", f"Voter {session.voter_id} has already cast their vote.")
+
+        # The operator may have selected someone else while the prompt was open.
+        if session.voter_id == self.current_voter_id:
+            self.voter_ready = False
+            self.refresh_buttons()
             self.db_image_label.config(image='')
             self.stop_camera()
 
-            for item in self.tree.get_children():
-                if self.tree.item(item)["values"][0] == self.current_voter_id:
-                    self.tree.item(item, values=(self.current_voter_id, self.current_voter_name, "Voted"))
-                    break
+        self.voter_list.set_status(session.voter_id, True)
+        if self.name_index is not None:
+            self.name_index.set_status(session.voter_id, True)
 
-        except (psycopg2.Error, ValueError, serial.SerialException) as e:
-            messagebox.showerror("Error", f"Failed to cast vote: {e}")
+    def end_vote_session(self, vote_window):
+        self.vote_session = None
+        self.vote_window = None
+        vote_window.destroy()
+        self.refresh_buttons()
 
     def show_results(self):
         try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
+            with db.cursor() as cur:
+                db.execute(cur, "results")
+                results = cur.fetchall()
 
-            cur.execute("SELECT party_name, votes FROM party ORDER BY votes DESC")
-            results = cur.fetchall()
-            
             if not results:
                 messagebox.showinfo("Results", "No votes have been cast yet.")
                 return
 
-            cur.close()
-            conn.close()
-
             results_window = tk.Toplevel(self)
             results_window.title("Voting Results")
             results_window.geometry("400x400") 
@@ -385,7 +659,11 @@ class EVMApp(tk.Tk):
 
     def __del__(self):
         if hasattr(self, 'camera'):
-            self.camera.release()
+            self.camera.stop()
+        if getattr(self, 'keypad', None) is not None:
+            self.keypad.stop()
+        if hasattr(self, 'sync_worker'):
+            self.sync_worker.stop()
 
 if __name__ == "__main__":
     app = EVMApp()
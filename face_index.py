@@ -0,0 +1,282 @@
+import threading
+import time
+import numpy as np
+import psycopg2
+import psycopg2.errors
+import face_store
+
+INDEX_PATH = "face_index.npz"
+# Both indexes keep every vector in memory as float32: 16 KB a voter with
+# VGG-Face (4096-d), so about 16 GB for a million voters, and loading needs
+# headroom for one more batch of rows on top. Rolls that do not fit need a
+# smaller model or an index outside the booth process.
+FETCH_BATCH = 10000
+# How long a refresh waits for in-flight embedding writes before it gives
+# up on advancing its watermark this time round.
+SETTLE_TIMEOUT = "200ms"
+
+def _normalize(vectors):
+    vectors = np.asarray(vectors, dtype=np.float32)
+    norms = np.linalg.norm(vectors, axis=-1, keepdims=True)
+    norms[norms == 0] = 1.0
+    return vectors / norms
+
+
+def settled_seq(cur, timeout=SETTLE_TIMEOUT):
+    # seq values are taken at write time but become visible at commit. A
+    # SHARE lock waits out the writes in flight (and is released at once),
+    # so every seq up to the value returned is committed or rolled back.
+    # None if a writer held on past the timeout. Ends the current transaction.
+    conn = cur.connection
+    try:
+        cur.execute("SET LOCAL lock_timeout = %s", (timeout,))
+        cur.execute("LOCK TABLE face_embeddings IN SHARE MODE")
+        cur.execute("SELECT CASE WHEN is_called THEN last_value ELSE 0 END FROM face_embeddings_seq")
+        seq = cur.fetchone()[0]
+        conn.commit()
+        return seq
+    except psycopg2.errors.LockNotAvailable:
+        conn.rollback()
+        return None
+
+
+def wait_settled_seq(cur):
+    seq = settled_seq(cur)
+    while seq is None:
+        time.sleep(1.0)
+        seq = settled_seq(cur)
+    return seq
+
+
+def fetch_embeddings(cur, model_name=face_store.MODEL_NAME, after_seq=0):
+    # Returns (ids, vectors, seqs) for embeddings written after `after_seq`.
+    # Rows stream through a server-side cursor so the raw result set is
+    # never held in memory next to the vectors.
+    ids = []
+    vectors = []
+    seqs = []
+    with cur.connection.cursor(name="fetch_embeddings") as stream:
+        stream.itersize = FETCH_BATCH
+        stream.execute(
+            """
+            SELECT voter_id, embedding, seq FROM face_embeddings
+            WHERE model_name = %s AND seq > %s
+            ORDER BY seq
+            """,
+            (model_name, after_seq)
+        )
+        for voter_id, data, seq in stream:
+            ids.append(voter_id)
+            vectors.append(np.frombuffer(bytes(data), dtype=np.float32))
+            seqs.append(seq)
+    return ids, vectors, seqs
+
+
+class _Index:
+    # watermark is a settled seq: every row at or below it has been applied.
+    # Rows above it may still be joined by slower commits, so they are
+    # re-read until the watermark passes them, but `applied` keeps them from
+    # being applied twice.
+    def refresh(self, cur):
+        settled = settled_seq(cur)
+        ids, vectors, seqs = fetch_embeddings(cur, self.model_name, after_seq=self.watermark)
+        fresh = [n for n, seq in enumerate(seqs) if seq not in self.applied]
+        self.add_batch([ids[n] for n in fresh], [vectors[n] for n in fresh])
+        self.applied.update(seqs[n] for n in fresh)
+        if settled is not None and settled > self.watermark:
+            self.watermark = settled
+            self.applied = {seq for seq in self.applied if seq > settled}
+        return len(fresh)
+
+    def best_match(self, query):
+        matches = self.search(query, k=1)
+        if matches and matches[0][1] <= self.threshold:
+            return matches[0]
+        return None
+
+
+class ExactIndex(_Index):
+    def __init__(self, ids=None, vectors=None, model_name=face_store.MODEL_NAME):
+        self.model_name = model_name
+        self.threshold = face_store.THRESHOLDS[model_name]
+        self.ids = np.empty(0, dtype=np.int64)
+        self.rows = {}
+        self.matrix = None
+        self.watermark = 0
+        self.applied = set()
+        # Refreshes run off the UI thread while searches run on another.
+        self.lock = threading.Lock()
+        if ids is not None:
+            self.add_batch(ids, vectors)
+
+    @classmethod
+    def from_db(cls, cur, model_name=face_store.MODEL_NAME):
+        settled = wait_settled_seq(cur)
+        ids, vectors, seqs = fetch_embeddings(cur, model_name)
+        index = cls(ids, vectors, model_name)
+        index.watermark = settled
+        index.applied = {seq for seq in seqs if seq > settled}
+        return index
+
+    def __len__(self):
+        return len(self.ids)
+
+    def add_batch(self, ids, vectors):
+        # Voters already indexed have their vector replaced in place.
+        if len(ids) == 0:
+            return
+        vectors = _normalize(np.vstack(vectors))
+        with self.lock:
+            new_ids, new_rows = [], []
+            for voter_id, row in zip(ids, range(len(vectors))):
+                position = self.rows.get(int(voter_id))
+                if position is None:
+                    self.rows[int(voter_id)] = len(self.ids) + len(new_ids)
+                    new_ids.append(int(voter_id))
+                    new_rows.append(row)
+                else:
+                    self.matrix[position] = vectors[row]
+            if new_ids:
+                self.ids = np.concatenate([self.ids, np.asarray(new_ids, dtype=np.int64)])
+                added = vectors[new_rows]
+                self.matrix = added if self.matrix is None else np.vstack([self.matrix, added])
+
+    def add(self, voter_id, embedding):
+        self.add_batch([voter_id], [embedding])
+
+    def search(self, query, k=1):
+        # Vectors are replaced in place, so the scan holds the lock.
+        with self.lock:
+            if self.matrix is None:
+                return []
+            ids = self.ids
+            distances = 1.0 - self.matrix @ _normalize(query)
+        k = min(k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return [(int(ids[i]), float(distances[i])) for i in top]
+
+
+class IVFIndex(_Index):
+    # Inverted-file index: vectors are bucketed by their nearest k-means
+    # centroid and a query only scans the nprobe closest buckets.
+    def __init__(self, centroids, model_name=face_store.MODEL_NAME, nprobe=8):
+        self.model_name = model_name
+        self.threshold = face_store.THRESHOLDS[model_name]
+        self.centroids = _normalize(centroids)
+        self.nprobe = nprobe
+        self.watermark = 0
+        self.applied = set()
+        self.lock = threading.Lock()
+        dim = self.centroids.shape[1]
+        self.list_ids = [np.empty(0, dtype=np.int64) for _ in range(len(self.centroids))]
+        self.list_vectors = [np.empty((0, dim), dtype=np.float32) for _ in range(len(self.centroids))]
+
+    @classmethod
+    def train(cls, vectors, nlist, model_name=face_store.MODEL_NAME, nprobe=8, iterations=10, seed=0):
+        vectors = _normalize(vectors)
+        rng = np.random.default_rng(seed)
+        sample_size = min(len(vectors), nlist * 64)
+        sample = vectors[rng.choice(len(vectors), sample_size, replace=False)]
+        centroids = sample[rng.choice(sample_size, nlist, replace=False)]
+
+        for _ in range(iterations):
+            assignment = np.argmax(sample @ centroids.T, axis=1)
+            order = np.argsort(assignment, kind="stable")
+            lists, starts = np.unique(assignment[order], return_index=True)
+            sums = centroids.copy()
+            sums[lists] = np.add.reduceat(sample[order], starts, axis=0)
+            centroids = _normalize(sums)
+
+        return cls(centroids, model_name, nprobe)
+
+    @classmethod
+    def build(cls, ids, vectors, nlist, model_name=face_store.MODEL_NAME, nprobe=8, watermark=0):
+        index = cls.train(vectors, nlist, model_name, nprobe)
+        index.add_batch(ids, vectors)
+        index.watermark = watermark
+        return index
+
+    def __len__(self):
+        return sum(len(ids) for ids in self.list_ids)
+
+    def _assign(self, vectors, chunk_size=65536):
+        assignment = np.empty(len(vectors), dtype=np.int64)
+        for start in range(0, len(vectors), chunk_size):
+            chunk = vectors[start:start + chunk_size]
+            assignment[start:start + chunk_size] = np.argmax(chunk @ self.centroids.T, axis=1)
+        return assignment
+
+    def add_batch(self, ids, vectors):
+        # Voters already indexed are moved to the list of their new vector.
+        # The new lists are built aside and swapped in together, so a search
+        # never pairs one list's ids with another version of its vectors.
+        if len(ids) == 0:
+            return
+        ids = np.asarray(ids, dtype=np.int64)
+        list_ids, list_vectors = list(self.list_ids), list(self.list_vectors)
+        for list_no, current in enumerate(list_ids):
+            keep = ~np.isin(current, ids)
+            if not keep.all():
+                list_ids[list_no] = current[keep]
+                list_vectors[list_no] = list_vectors[list_no][keep]
+
+        vectors = _normalize(np.vstack(vectors))
+        assignment = self._assign(vectors)
+        order = np.argsort(assignment, kind="stable")
+        lists, starts = np.unique(assignment[order], return_index=True)
+        ends = np.append(starts[1:], len(order))
+        for list_no, start, end in zip(lists, starts, ends):
+            rows = order[start:end]
+            list_ids[list_no] = np.concatenate([list_ids[list_no], ids[rows]])
+            list_vectors[list_no] = np.vstack([list_vectors[list_no], vectors[rows]])
+
+        with self.lock:
+            self.list_ids, self.list_vectors = list_ids, list_vectors
+
+    def add(self, voter_id, embedding):
+        self.add_batch([voter_id], [embedding])
+
+    def search(self, query, k=1):
+        query = _normalize(query)
+        nprobe = min(self.nprobe, len(self.centroids))
+        probes = np.argpartition(-(self.centroids @ query), nprobe - 1)[:nprobe]
+        with self.lock:
+            list_ids, list_vectors = self.list_ids, self.list_vectors
+        ids = np.concatenate([list_ids[i] for i in probes])
+        if len(ids) == 0:
+            return []
+        vectors = np.vstack([list_vectors[i] for i in probes])
+        distances = 1.0 - vectors @ query
+        k = min(k, len(distances))
+        top = np.argpartition(distances, k - 1)[:k]
+        top = top[np.argsort(distances[top])]
+        return [(int(ids[i]), float(distances[i])) for i in top]
+
+    def save(self, path):
+        sizes = np.array([len(ids) for ids in self.list_ids], dtype=np.int64)
+        np.savez(
+            path,
+            centroids=self.centroids,
+            ids=np.concatenate(self.list_ids),
+            vectors=np.vstack(self.list_vectors),
+            sizes=sizes,
+            nprobe=self.nprobe,
+            seq_watermark=self.watermark,
+            model_name=self.model_name
+        )
+
+    @classmethod
+    def load(cls, path):
+        data = np.load(path)
+        index = cls(data["centroids"], str(data["model_name"]), int(data["nprobe"]))
+        offsets = np.concatenate([[0], np.cumsum(data["sizes"])])
+        ids, vectors = data["ids"], data["vectors"]
+        for list_no in range(len(index.centroids)):
+            start, end = offsets[list_no], offsets[list_no + 1]
+            index.list_ids[list_no] = ids[start:end]
+            index.list_vectors[list_no] = vectors[start:end]
+        # Indexes saved before seq existed hold a voter-id watermark; start
+        # over from seq 0, which re-applies every row once.
+        index.watermark = int(data["seq_watermark"]) if "seq_watermark" in data else 0
+        return index
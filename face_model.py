@@ -0,0 +1,49 @@
+import threading
+import numpy as np
+from deepface import DeepFace
+import face_store
+
+DETECTOR_BACKEND = "opencv"
+
+
+class FaceModelManager:
+    def __init__(self, model_name=face_store.MODEL_NAME, detector_backend=DETECTOR_BACKEND):
+        self.model_name = model_name
+        self.detector_backend = detector_backend
+        self.model = None
+        self.error = None
+        self.ready = threading.Event()
+        self._lock = threading.Lock()
+        self._thread = None
+
+    def start_warmup(self):
+        if self._thread is None:
+            self._thread = threading.Thread(target=self._warmup, daemon=True)
+            self._thread.start()
+
+    def _warmup(self):
+        try:
+            with self._lock:
+                # build_model caches the weights inside DeepFace, so every later
+                # represent() call reuses this same model object.
+                self.model = DeepFace.build_model(self.model_name)
+                dummy = np.zeros((224, 224, 3), dtype=np.uint8)
+                face_store.compute_embedding(dummy, self.model_name, self.detector_backend)
+        except Exception as e:
+            self.error = e
+        finally:
+            self.ready.set()
+
+    def is_ready(self):
+        return self.ready.is_set() and self.error is None
+
+    def wait(self, timeout=None):
+        self.start_warmup()
+        return self.ready.wait(timeout)
+
+    def embed(self, image_bgr):
+        self.wait()
+        if self.error is not None:
+            raise RuntimeError(f"Face model failed to load: {self.error}")
+        with self._lock:
+            return face_store.compute_embedding(image_bgr, self.model_name, self.detector_backend)
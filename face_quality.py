@@ -0,0 +1,119 @@
+import time
+import cv2
+import face_store
+
+CASCADE_PATH = cv2.data.haarcascades + "haarcascade_frontalface_default.xml"
+DETECT_WIDTH = 160
+MIN_QUALITY = 0.2
+
+_cascade = None
+
+
+def _get_cascade():
+    global _cascade
+    if _cascade is None:
+        _cascade = cv2.CascadeClassifier(CASCADE_PATH)
+    return _cascade
+
+
+def detect_faces(frame, width=DETECT_WIDTH):
+    # Runs on a downscaled grey copy; boxes are returned in full-frame pixels.
+    scale = width / frame.shape[1]
+    small = cv2.resize(frame, (width, int(frame.shape[0] * scale)), interpolation=cv2.INTER_AREA)
+    gray = cv2.cvtColor(small, cv2.COLOR_BGR2GRAY)
+    faces = _get_cascade().detectMultiScale(gray, scaleFactor=1.2, minNeighbors=4, minSize=(20, 20))
+    return [tuple(int(v / scale) for v in face) for face in faces]
+
+
+def score_frame(frame):
+    faces = detect_faces(frame)
+    if not faces:
+        return 0.0, None
+
+    x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+    gray = cv2.cvtColor(frame[y:y + h, x:x + w], cv2.COLOR_BGR2GRAY)
+
+    sharpness = min(cv2.Laplacian(gray, cv2.CV_64F).var() / 300.0, 1.0)
+    brightness = 1.0 - abs(float(gray.mean()) - 128.0) / 128.0
+    size = min((w * h) / (frame.shape[0] * frame.shape[1]) / 0.15, 1.0)
+
+    return sharpness * 0.5 + brightness * 0.2 + size * 0.3, (x, y, w, h)
+
+
+def verify_from_stream(camera, face_model, stored_embedding, time_budget=3.0, max_embeds=3):
+    # Scores every new frame from the camera buffer, embeds the best of each
+    # batch and accepts on the first match. Returns (verified, best_distance).
+    deadline = time.monotonic() + time_budget
+    last_sequence = 0
+    best_distance = None
+    embedded = 0
+
+    while embedded < max_embeds and time.monotonic() < deadline:
+        frames = camera.recent(last_sequence)
+        if not frames:
+            time.sleep(0.02)
+            continue
+        last_sequence = frames[-1][0]
+
+        score, frame = max(((score_frame(entry[2])[0], entry[2]) for entry in frames), key=lambda item: item[0])
+        if score < MIN_QUALITY:
+            continue
+
+        verified, distance = face_store.is_match(stored_embedding, face_model.embed(frame))
+        embedded += 1
+        if best_distance is None or distance < best_distance:
+            best_distance = distance
+        if verified:
+            return True, distance
+
+    return False, best_distance
+
+
+class FacePresenceGate:
+    # Opens once a single, centred, large-enough face has held still for
+    # `stable_frames` consecutive detections.
+    def __init__(self, stable_frames=5, min_width=0.2, max_offset=0.2, max_motion=0.08):
+        self.stable_frames = stable_frames
+        self.min_width = min_width
+        self.max_offset = max_offset
+        self.max_motion = max_motion
+        self.reset()
+
+    def reset(self):
+        self.streak = 0
+        self.last_box = None
+        self.status = "No face"
+
+    @property
+    def is_open(self):
+        return self.streak >= self.stable_frames
+
+    def update(self, faces, frame_shape):
+        height, width = frame_shape[:2]
+
+        if len(faces) != 1:
+            self.streak = 0
+            self.last_box = None
+            self.status = "No face" if not faces else "More than one face"
+            return self.is_open
+
+        x, y, w, h = faces[0]
+        centre_x, centre_y = (x + w / 2) / width, (y + h / 2) / height
+
+        if w / width < self.min_width:
+            self.streak = 0
+            self.status = "Move closer"
+        elif abs(centre_x - 0.5) > self.max_offset or abs(centre_y - 0.5) > self.max_offset:
+            self.streak = 0
+            self.status = "Centre your face"
+        elif self.last_box is not None and (
+                abs(x - self.last_box[0]) / width > self.max_motion or
+                abs(y - self.last_box[1]) / height > self.max_motion):
+            self.streak = 1
+            self.status = "Hold still"
+        else:
+            self.streak += 1
+            self.status = "Ready" if self.is_open else "Hold still"
+
+        self.last_box = (x, y, w, h)
+        return self.is_open
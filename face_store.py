@@ -0,0 +1,75 @@
+import numpy as np
+import psycopg2
+import db
+from deepface import DeepFace
+
+MODEL_NAME = "VGG-Face"
+
+# Cosine distance thresholds DeepFace.verify uses for each model.
+THRESHOLDS = {
+    "VGG-Face": 0.68,
+    "Facenet": 0.40,
+    "Facenet512": 0.30,
+    "ArcFace": 0.68,
+    "Dlib": 0.07,
+    "SFace": 0.593,
+    "OpenFace": 0.10,
+    "DeepFace": 0.23,
+    "DeepID": 0.015,
+    "GhostFaceNet": 0.65,
+}
+
+# Length of the vector each model's represent() returns.
+EMBEDDING_SIZES = {
+    "VGG-Face": 4096,
+    "Facenet": 128,
+    "Facenet512": 512,
+    "ArcFace": 512,
+    "Dlib": 128,
+    "SFace": 128,
+    "OpenFace": 128,
+    "DeepFace": 4096,
+    "DeepID": 160,
+    "GhostFaceNet": 512,
+}
+
+
+def compute_embedding(image_bgr, model_name=MODEL_NAME, detector_backend="opencv"):
+    result = DeepFace.represent(
+        image_bgr,
+        model_name=model_name,
+        detector_backend=detector_backend,
+        enforce_detection=False
+    )
+    return np.asarray(result[0]["embedding"], dtype=np.float32)
+
+
+def cosine_distance(a, b):
+    a = np.asarray(a, dtype=np.float32)
+    b = np.asarray(b, dtype=np.float32)
+    return 1.0 - float(np.dot(a, b) / (np.linalg.norm(a) * np.linalg.norm(b)))
+
+
+def is_match(stored, live, model_name=MODEL_NAME):
+    distance = cosine_distance(stored, live)
+    return distance <= THRESHOLDS[model_name], distance
+
+
+def save_embedding(cur, voter_id, embedding, model_name=MODEL_NAME):
+    data = np.asarray(embedding, dtype=np.float32).tobytes()
+    cur.execute(
+        """
+        INSERT INTO face_embeddings (voter_id, model_name, embedding)
+        VALUES (%s, %s, %s)
+        ON CONFLICT (voter_id, model_name) DO UPDATE SET embedding = EXCLUDED.embedding
+        """,
+        (voter_id, model_name, psycopg2.Binary(data))
+    )
+
+
+def load_embedding(cur, voter_id, model_name=MODEL_NAME):
+    db.execute(cur, "voter_embedding", (voter_id, model_name))
+    row = cur.fetchone()
+    if row is None:
+        return None
+    return np.frombuffer(bytes(row[0]), dtype=np.float32)
@@ -0,0 +1,211 @@
+import argparse
+import random
+import sys
+import time
+from datetime import datetime, timedelta, timezone
+from multiprocessing import Pool
+import numpy as np
+import psycopg2
+from PIL import Image, ImageDraw
+import db
+import face_store
+import image_codec
+import image_store
+import migrate
+import thumbnails
+
+# Every block of ids is generated from its own seed, so the roll is the
+# same whatever --streams is and blocks can be loaded in any order.
+BLOCK_SIZE = 2000
+POLL_START = datetime(2026, 1, 1, 7, 0, tzinfo=timezone.utc)
+
+FIRST_NAMES = [
+    "Aarav", "Abhiram", "Aditi", "Aditya", "Akash", "Ananya", "Anil", "Anjali", "Arjun", "Bhavana",
+    "Chandra", "Deepa", "Devi", "Divya", "Ganesh", "Gauri", "Gopal", "Harini", "Harish", "Indira",
+    "Jaya", "Karthik", "Kavya", "Keerthi", "Krishna", "Lakshmi", "Madhavi", "Mahesh", "Manoj", "Meena",
+    "Mohan", "Nagesh", "Nandini", "Naveen", "Neha", "Padma", "Pooja", "Prakash", "Priya", "Radha",
+    "Rahul", "Rajesh", "Ramesh", "Ramya", "Ravi", "Rekha", "Sai", "Sandeep", "Sanjay", "Saritha",
+    "Shanti", "Shreya", "Sita", "Srinivas", "Sunil", "Sunita", "Suresh", "Swathi", "Uma", "Usha",
+    "Varun", "Venkat", "Vidya", "Vijay", "Vinod", "Yamini",
+]
+SURNAMES = [
+    "Reddy", "Rao", "Naidu", "Sharma", "Kumar", "Verma", "Iyer", "Iyengar", "Nair", "Menon",
+    "Pillai", "Gupta", "Patel", "Shah", "Joshi", "Kulkarni", "Deshpande", "Chowdary", "Varma", "Murthy",
+    "Prasad", "Goud", "Yadav", "Singh", "Das", "Banerjee", "Mukherjee", "Ghosh", "Bose", "Sen",
+    "Khan", "Ahmed", "Hussain", "Fernandes", "D'Souza", "Thomas", "Mathew", "Krishnan", "Subramanian", "Rajan",
+]
+
+
+def voter_name(rng):
+    if rng.random() < 0.15:
+        return f"{rng.choice(FIRST_NAMES)} {rng.choice('ABCDGKMNPRSV')}. {rng.choice(SURNAMES)}"
+    return f"{rng.choice(FIRST_NAMES)} {rng.choice(SURNAMES)}"
+
+
+def synthetic_photo(rng):
+    # A rough portrait: plain background, head, eyes and mouth, with the
+    # colours and positions varied so photos hash and compress differently.
+    image = Image.new("RGB", (300, 225), tuple(rng.randrange(120, 256) for _ in range(3)))
+    draw = ImageDraw.Draw(image)
+    skin = rng.choice([(241, 194, 125), (224, 172, 105), (198, 134, 66), (141, 85, 36), (255, 219, 172)])
+    cx, cy = 150 + rng.randint(-15, 15), 112 + rng.randint(-10, 10)
+    w, h = rng.randint(50, 65), rng.randint(65, 80)
+    draw.ellipse((cx - w, cy - h, cx + w, cy + h), fill=skin)
+    draw.chord((cx - w, cy - h - 5, cx + w, cy), 180, 360, fill=tuple(rng.randrange(60) for _ in range(3)))
+    for dx in (-w // 2, w // 2):
+        draw.ellipse((cx + dx - 6, cy - 12, cx + dx + 6, cy - 4), fill=(40, 30, 20))
+    draw.arc((cx - 20, cy + 15, cx + 20, cy + 40), 20, 160, fill=(120, 40, 40), width=3)
+    return image
+
+
+def photo_pool(seed, count):
+    rng = random.Random(f"{seed}:photos")
+    photos = [synthetic_photo(rng) for _ in range(count)]
+    blobs = [image_codec.encode_photo(photo) for photo in photos]
+    return photos, blobs, [image_store.image_hash(data) for data in blobs]
+
+
+_config = None
+
+
+def _init_worker(config):
+    # Photos and thumbnails are shipped to each worker once, not per block.
+    global _config
+    _config = config
+
+
+def generate_block(task):
+    # Runs in a worker process with its own connection: one COPY stream per block.
+    block, first_id, last_id = task
+    config = _config
+    rng = random.Random(f"{config['seed']}:{block}")
+    vectors = np.random.default_rng([config["seed"], block])
+    hashes, thumbs, embeddings = config["hashes"], config["thumbs"], config["embeddings"]
+    party_weights = config["party_weights"]
+    party_ids = list(range(1, len(party_weights) + 1))
+
+    voters, thumbnail_rows, embedding_rows, votes = [], [], [], []
+    for voter_id in range(first_id, last_id + 1):
+        photo = rng.randrange(len(hashes))
+        voted = rng.random() < config["turnout"]
+        voters.append((voter_id, voter_name(rng), hashes[photo], voted))
+
+        if thumbs is not None:
+            thumbnail_rows.extend((voter_id, size, data) for size, data in thumbs[photo].items())
+        if config["embedding_mode"] == "real":
+            embedding_rows.append((voter_id, config["model"], embeddings[photo]))
+        elif config["embedding_mode"] == "random":
+            vector = vectors.standard_normal(face_store.EMBEDDING_SIZES[config["model"]], dtype=np.float32)
+            embedding_rows.append((voter_id, config["model"], vector.tobytes()))
+        if voted:
+            party_id = rng.choices(party_ids, party_weights)[0]
+            cast_at = POLL_START + timedelta(seconds=rng.randrange(11 * 3600))
+            votes.append((voter_id, party_id, f"booth-{rng.randrange(config['booths']) + 1}", cast_at.isoformat()))
+
+    conn = db.connect()
+    try:
+        with conn.cursor() as cur:
+            db.copy_rows(cur, "voters", ("id", "name", "image_hash", "vote_status"), voters)
+            if thumbnail_rows:
+                db.copy_rows(cur, "voter_thumbnails", ("voter_id", "size", "image"), thumbnail_rows)
+            if embedding_rows:
+                db.copy_rows(cur, "face_embeddings", ("voter_id", "model_name", "embedding"), embedding_rows)
+            if votes:
+                db.copy_rows(cur, "votes", ("voter_id", "party_id", "booth_id", "cast_at"), votes)
+        conn.commit()
+    finally:
+        conn.close()
+    return len(voters)
+
+
+def generate(voters, parties, seed=42, streams=4, turnout=0.0, booths=100, embeddings="random",
+             model_name=face_store.MODEL_NAME, with_thumbnails=True, photos=256):
+    rng = random.Random(f"{seed}:parties")
+    pool_photos, blobs, hashes = photo_pool(seed, photos)
+
+    embedding_bytes = None
+    if embeddings == "real":
+        # Real embeddings are computed once per distinct photo and shared by
+        # every voter using that photo.
+        embedding_bytes = [
+            face_store.compute_embedding(np.array(photo)[:, :, ::-1], model_name).tobytes() for photo in pool_photos
+        ]
+
+    with db.cursor() as cur:
+        cur.execute("TRUNCATE votes, vote_tally, voter_thumbnails, face_embeddings, voters, party, image_blobs "
+                    "RESTART IDENTITY CASCADE")
+        db.copy_rows(cur, "image_blobs", ("sha256", "data"), zip(hashes, blobs))
+        db.copy_rows(cur, "party", ("id", "party_name"), ((n, f"Party {n}") for n in range(1, parties + 1)))
+        cur.execute("SELECT setval(pg_get_serial_sequence('party', 'id'), %s)", (parties,))
+        # Ballots loaded in bulk must not each raise a live-results notification.
+        cur.execute("ALTER TABLE votes DISABLE TRIGGER votes_notify")
+
+    config = {
+        "seed": seed,
+        "hashes": hashes,
+        "thumbs": [{size: thumbnails.encode_thumbnail(photo, size) for size in thumbnails.SIZES}
+                   for photo in pool_photos] if with_thumbnails else None,
+        "embeddings": embedding_bytes,
+        "embedding_mode": embeddings,
+        "model": model_name,
+        "turnout": turnout,
+        "booths": booths,
+        # A few large parties and a long tail of small ones.
+        "party_weights": [rng.paretovariate(1.2) for _ in range(parties)],
+    }
+    tasks = [
+        (block, first_id, min(first_id + BLOCK_SIZE - 1, voters))
+        for block, first_id in enumerate(range(1, voters + 1, BLOCK_SIZE))
+    ]
+
+    started = time.perf_counter()
+    loaded = 0
+    try:
+        with Pool(streams, initializer=_init_worker, initargs=(config,)) as pool:
+            for count in pool.imap_unordered(generate_block, tasks):
+                loaded += count
+                rate = loaded / (time.perf_counter() - started)
+                print(f"{loaded}/{voters} voters loaded, {rate:.0f} rows/s", file=sys.stderr)
+    finally:
+        with db.cursor() as cur:
+            cur.execute("ALTER TABLE votes ENABLE TRIGGER votes_notify")
+
+    with db.cursor() as cur:
+        cur.execute("SELECT setval(pg_get_serial_sequence('voters', 'id'), %s)", (max(voters, 1),))
+        cur.execute("""
+            INSERT INTO vote_tally (party_id, booth_id, votes)
+            SELECT party_id, booth_id, count(*) FROM votes GROUP BY party_id, booth_id
+        """)
+        cur.execute("ANALYZE")
+    return loaded
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Load a deterministic synthetic voter roll for scale testing")
+    parser.add_argument("--voters", type=int, default=1_000_000)
+    parser.add_argument("--parties", type=int, default=40)
+    parser.add_argument("--seed", type=int, default=42)
+    parser.add_argument("--streams", type=int, default=4, help="parallel COPY connections")
+    parser.add_argument("--turnout", type=float, default=0.0, help="fraction of voters who have already voted")
+    parser.add_argument("--booths", type=int, default=100)
+    parser.add_argument("--embeddings", choices=["none", "random", "real"], default="none",
+                        help="random vectors, or real ones computed from the synthetic photos")
+    parser.add_argument("--model", default=face_store.MODEL_NAME)
+    parser.add_argument("--photos", type=int, default=256, help="distinct synthetic photos shared across the roll")
+    parser.add_argument("--no-thumbnails", action="store_true")
+    parser.add_argument("--yes", action="store_true", help="confirm that the target database will be wiped")
+    args = parser.parse_args()
+
+    target = db.load_config()["dbname"]
+    if not args.yes:
+        sys.exit(f"This replaces every voter, party and vote in '{target}'. Re-run with --yes to continue.")
+
+    try:
+        migrate.migrate()
+        started = time.perf_counter()
+        loaded = generate(args.voters, args.parties, args.seed, args.streams, args.turnout, args.booths,
+                          args.embeddings, args.model, not args.no_thumbnails, args.photos)
+        print(f"Loaded {loaded} voters and {args.parties} parties into '{target}' "
+              f"in {time.perf_counter() - started:.1f} s.")
+    except psycopg2.Error as e:
+        print(f"Error generating voter roll: {e}")
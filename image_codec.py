@@ -0,0 +1,51 @@
+import io
+import os
+import numpy as np
+from PIL import Image
+import face_quality
+
+# Storage codec for enrolled photos. PNG keeps the old lossless behaviour.
+FORMATS = {"png": "PNG", "jpeg": "JPEG", "webp": "WEBP"}
+IMAGE_FORMAT = os.environ.get("EVM_IMAGE_FORMAT", "jpeg")
+IMAGE_QUALITY = int(os.environ.get("EVM_IMAGE_QUALITY", "90"))
+FACE_CROP = os.environ.get("EVM_IMAGE_FACE_CROP", "0") == "1"
+CROP_MARGIN = 0.4
+
+
+def crop_face(image, margin=CROP_MARGIN):
+    # Keeps the largest face plus `margin` of its size on every side, so the
+    # face detector used for embedding still finds it. No face: left whole.
+    frame = np.array(image.convert("RGB"))[:, :, ::-1]
+    faces = face_quality.detect_faces(frame)
+    if not faces:
+        return image
+
+    x, y, w, h = max(faces, key=lambda face: face[2] * face[3])
+    pad_x, pad_y = int(w * margin), int(h * margin)
+    return image.crop((
+        max(0, x - pad_x), max(0, y - pad_y),
+        min(image.width, x + w + pad_x), min(image.height, y + h + pad_y)
+    ))
+
+
+def encode_photo(image, fmt=IMAGE_FORMAT, quality=IMAGE_QUALITY, face_crop=FACE_CROP):
+    image = image.convert("RGB")
+    if face_crop:
+        image = crop_face(image)
+
+    buffer = io.BytesIO()
+    if fmt == "png":
+        image.save(buffer, format="PNG", optimize=True)
+    elif fmt == "jpeg":
+        image.save(buffer, format="JPEG", quality=quality, optimize=True)
+    elif fmt == "webp":
+        image.save(buffer, format="WEBP", quality=quality, method=4)
+    else:
+        raise ValueError(f"unknown image format {fmt!r}, expected one of {', '.join(FORMATS)}")
+    return buffer.getvalue()
+
+
+def image_format(data):
+    # "png", "jpeg", "webp" or None for anything else.
+    with Image.open(io.BytesIO(data)) as image:
+        return {pil: name for name, pil in FORMATS.items()}.get(image.format)
@@ -0,0 +1,28 @@
+import hashlib
+import psycopg2
+
+
+def image_hash(data):
+    return hashlib.sha256(data).hexdigest()
+
+
+def store_image(cur, data):
+    digest = image_hash(data)
+    cur.execute(
+        "INSERT INTO image_blobs (sha256, data) VALUES (%s, %s) ON CONFLICT (sha256) DO NOTHING",
+        (digest, psycopg2.Binary(data))
+    )
+    return digest
+
+
+def fetch_images(cur, voter_ids):
+    # One round trip for a whole batch of voters; returns {voter_id: bytes}.
+    cur.execute(
+        """
+        SELECT v.id, b.data FROM voters v
+        JOIN image_blobs b ON b.sha256 = v.image_hash
+        WHERE v.id = ANY(%s)
+        """,
+        (list(voter_ids),)
+    )
+    return {voter_id: bytes(data) for voter_id, data in cur.fetchall()}
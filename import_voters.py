@@ -0,0 +1,137 @@
+import argparse
+import csv
+import os
+import sys
+import time
+from multiprocessing import Pool
+import numpy as np
+import psycopg2
+from PIL import Image, ImageOps
+import db
+import face_store
+import image_codec
+import image_store
+import job_state
+import thumbnails
+
+PHOTO_SIZE = (300, 225)
+BATCH_SIZE = 1000
+
+
+def prepare_voter(task):
+    # Runs in a worker process: decode and normalize the photo the way
+    # register_voter.py does, then embed it and render the thumbnails.
+    line, name, path, model_name = task
+    try:
+        with Image.open(path) as image:
+            photo = ImageOps.exif_transpose(image).convert("RGB").resize(PHOTO_SIZE)
+
+        data = image_codec.encode_photo(photo)
+
+        embedding = None
+        if model_name is not None:
+            image_bgr = np.array(photo)[:, :, ::-1]
+            embedding = face_store.compute_embedding(image_bgr, model_name).tobytes()
+
+        thumbs = {size: thumbnails.encode_thumbnail(photo, size) for size in thumbnails.SIZES}
+        return line, (name, data, embedding, thumbs), None
+    except Exception as e:
+        return line, None, f"{path}: {e}"
+
+
+def read_tasks(csv_path, photo_dir, start_line, model_name):
+    with open(csv_path, newline="", encoding="utf-8") as f:
+        for line, row in enumerate(csv.DictReader(f), start=1):
+            if line <= start_line:
+                continue
+            yield line, row["name"].strip(), os.path.join(photo_dir, row["photo"]), model_name
+
+
+def write_batch(cur, batch, model_name):
+    blobs = {}
+    for _, data, _, _ in batch:
+        blobs.setdefault(image_store.image_hash(data), data)
+
+    cur.execute("CREATE TEMP TABLE IF NOT EXISTS import_blobs (sha256 CHAR(64), data BYTEA) ON COMMIT DELETE ROWS")
+    db.copy_rows(cur, "import_blobs", ("sha256", "data"), blobs.items())
+    cur.execute("INSERT INTO image_blobs SELECT sha256, data FROM import_blobs ON CONFLICT (sha256) DO NOTHING")
+
+    # Ids are reserved up front so the dependent rows can be COPYed too.
+    cur.execute("SELECT nextval(pg_get_serial_sequence('voters', 'id')) FROM generate_series(1, %s)", (len(batch),))
+    ids = [row[0] for row in cur.fetchall()]
+
+    db.copy_rows(cur, "voters", ("id", "name", "image_hash"), (
+        (voter_id, name, image_store.image_hash(data)) for voter_id, (name, data, _, _) in zip(ids, batch)
+    ))
+    db.copy_rows(cur, "face_embeddings", ("voter_id", "model_name", "embedding"), (
+        (voter_id, model_name, embedding) for voter_id, (_, _, embedding, _) in zip(ids, batch)
+        if embedding is not None
+    ))
+    db.copy_rows(cur, "voter_thumbnails", ("voter_id", "size", "image"), (
+        (voter_id, size, thumb) for voter_id, (_, _, _, thumbs) in zip(ids, batch)
+        for size, thumb in thumbs.items()
+    ))
+
+
+def import_voters(csv_path, photo_dir, job, model_name, workers, batch_size):
+    with db.cursor() as cur:
+        state = job_state.load_state(cur, job)
+    start_line = state.get("line", 0)
+    imported = state.get("imported", 0)
+    failed = state.get("failed", 0)
+    if start_line:
+        print(f"Resuming {job} after line {start_line} ({imported} imported so far).")
+
+    started = time.perf_counter()
+    imported_now = 0
+    batch, last_line = [], start_line
+
+    def flush():
+        nonlocal imported, imported_now, batch
+        with db.cursor() as cur:
+            if batch:
+                write_batch(cur, batch, model_name)
+            job_state.save_state(cur, job, {"line": last_line, "imported": imported + len(batch), "failed": failed})
+        imported += len(batch)
+        imported_now += len(batch)
+        rate = imported_now / (time.perf_counter() - started)
+        print(f"line {last_line}: {imported} imported, {failed} failed, {rate:.0f} rows/s")
+        batch = []
+
+    with Pool(workers) as pool:
+        tasks = read_tasks(csv_path, photo_dir, start_line, model_name)
+        for line, row, error in pool.imap(prepare_voter, tasks, chunksize=8):
+            last_line = line
+            if error is not None:
+                failed += 1
+                print(f"Skipping line {line}: {error}", file=sys.stderr)
+            else:
+                batch.append(row)
+            if len(batch) >= batch_size:
+                flush()
+        flush()
+
+    print(f"Done: {imported} voters imported, {failed} failed.")
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Bulk-import voters from a CSV (name,photo) and a photo directory")
+    parser.add_argument("csv")
+    parser.add_argument("photo_dir")
+    parser.add_argument("--job", default=None, help="checkpoint name, defaults to import:<csv file name>")
+    parser.add_argument("--model", default=face_store.MODEL_NAME)
+    parser.add_argument("--no-embed", action="store_true", help="skip embeddings; backfill them later")
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--batch-size", type=int, default=BATCH_SIZE)
+    parser.add_argument("--restart", action="store_true", help="discard the checkpoint and start from the top")
+    args = parser.parse_args()
+
+    job = args.job or f"import:{os.path.basename(args.csv)}"
+    try:
+        if args.restart:
+            with db.cursor() as cur:
+                job_state.clear_state(cur, job)
+        import_voters(args.csv, args.photo_dir, job, None if args.no_embed else args.model,
+                      args.workers, args.batch_size)
+    except psycopg2.Error as e:
+        print(f"Error importing voters: {e}")
@@ -0,0 +1,21 @@
+import json
+
+
+def load_state(cur, job):
+    cur.execute("SELECT state FROM job_state WHERE job = %s", (job,))
+    row = cur.fetchone()
+    return row[0] if row is not None else {}
+
+
+def save_state(cur, job, state):
+    cur.execute(
+        """
+        INSERT INTO job_state (job, state) VALUES (%s, %s)
+        ON CONFLICT (job) DO UPDATE SET state = EXCLUDED.state, updated_at = now()
+        """,
+        (job, json.dumps(state))
+    )
+
+
+def clear_state(cur, job):
+    cur.execute("DELETE FROM job_state WHERE job = %s", (job,))
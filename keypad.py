@@ -0,0 +1,118 @@
+import os
+import queue
+import select
+import threading
+import time
+import serial
+
+DEFAULT_KEYPAD = "serial:COM4"
+BAUD_RATE = 9600
+
+
+class KeypadReader:
+    # Reads keypad lines from the Arduino on its own thread and hands each
+    # key to `on_key`. The port's read timeout bounds how long stop() waits.
+    def __init__(self, port, on_key, on_error=None):
+        self.port = port
+        self.on_key = on_key
+        self.on_error = on_error
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        if self._thread is None:
+            self._running.set()
+            self._thread = threading.Thread(target=self._run, daemon=True)
+            self._thread.start()
+
+    def _run(self):
+        while self._running.is_set():
+            try:
+                line = self.port.readline()
+            except (serial.SerialException, OSError) as e:
+                if self.on_error is not None:
+                    self.on_error(e)
+                return
+            key = line.decode("utf-8", errors="ignore").strip()
+            if key:
+                self.on_key(key)
+
+    def stop(self):
+        self._running.clear()
+        if self._thread is not None:
+            self._thread.join(timeout=2)
+            self._thread = None
+
+
+class ScriptedKeypad:
+    # In-process stand-in for the Arduino. Keys come from press() or from
+    # `keys`, replayed one every `interval` seconds; readline() behaves like
+    # a serial port with a read timeout.
+    def __init__(self, keys=None, interval=1.0, timeout=1.0):
+        self.timeout = timeout
+        self.pending = queue.Queue()
+        if keys:
+            threading.Thread(target=self._replay, args=(list(keys), interval), daemon=True).start()
+
+    def _replay(self, keys, interval):
+        for key in keys:
+            time.sleep(interval)
+            self.press(key)
+
+    def press(self, key):
+        self.pending.put(f"{key}\r\n".encode("utf-8"))
+
+    def readline(self):
+        try:
+            return self.pending.get(timeout=self.timeout)
+        except queue.Empty:
+            return b""
+
+    def close(self):
+        pass
+
+
+class PtyKeypad:
+    # A pseudo-terminal standing in for the serial port. The booth reads the
+    # master side; anything written to `path` (the slave, e.g. `echo 1 >
+    # /dev/pts/N`) arrives as key presses. The slave fd stays open so reads
+    # do not fail with EIO while no writer is attached.
+    def __init__(self, timeout=1.0):
+        self.timeout = timeout
+        self.master, self.slave = os.openpty()
+        self.path = os.ttyname(self.slave)
+        self.buffer = b""
+
+    def readline(self):
+        deadline = time.monotonic() + self.timeout
+        while b"\n" not in self.buffer:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0 or not select.select([self.master], [], [], remaining)[0]:
+                return b""
+            self.buffer += os.read(self.master, 1024)
+        line, self.buffer = self.buffer.split(b"\n", 1)
+        return line + b"\n"
+
+    def close(self):
+        os.close(self.master)
+        os.close(self.slave)
+
+
+def open_keypad(spec=None):
+    # spec (or EVM_KEYPAD) selects the ballot input backend:
+    #   serial:COM4 / serial:/dev/ttyACM0  the Arduino keypad (default)
+    #   socket://host:port, loop://        any pyserial URL, e.g. a socket loopback
+    #   pty                                a local pseudo-terminal, path printed on start
+    #   sim / sim:1,2,3                    in-process simulator, optional scripted keys
+    spec = spec or os.environ.get("EVM_KEYPAD", DEFAULT_KEYPAD)
+
+    if spec.startswith("serial:"):
+        return serial.Serial(spec[len("serial:"):], BAUD_RATE, timeout=1)
+    if spec == "pty":
+        backend = PtyKeypad()
+        print(f"Keypad pty: write keys to {backend.path}")
+        return backend
+    if spec == "sim" or spec.startswith("sim:"):
+        keys = spec[len("sim:"):].split(",") if spec.startswith("sim:") else None
+        return ScriptedKeypad(keys, interval=2.0)
+    return serial.serial_for_url(spec, BAUD_RATE, timeout=1)
@@ -0,0 +1,204 @@
+import argparse
+import json
+import os
+import re
+import psycopg2
+from psycopg2 import sql as pgsql
+import db
+
+MIGRATIONS_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "migrations")
+MIGRATION_FILE = re.compile(r"^(\d{4})_(\w+)\.sql$")
+NO_TRANSACTION = "-- migrate: no-transaction"
+LOCK_ID = 7_346_001
+CREATED_INDEX = re.compile(r"CREATE\s+(?:UNIQUE\s+)?INDEX\s+CONCURRENTLY\s+IF\s+NOT\s+EXISTS\s+(\w+)", re.I)
+
+# Hot queries, sample parameters and the indexes their plans must use.
+# A tuple lists alternatives, any one of which is enough.
+CHECKED_QUERIES = {
+    "search_voters": (("%ram%",), ["voters_name_trgm_idx"]),
+    "voter_page": ((0, 200), ["voters_pkey"]),
+    "voter_id_at": ((1000,), ["voters_pkey"]),
+    "voter_id_before": ((1000, 200), ["voters_pkey"]),
+    "last_voter_id": ((), ["voters_pkey"]),
+    "voter_locate": ((1000,), ["voters_pkey"]),
+    "voter_image": ((1,), ["voters_pkey", "image_blobs_pkey"]),
+    "voter_thumbnail": ((1, "booth"), ["voters_pkey", "voter_thumbnails_pkey"]),
+    "voter_status": ((1,), ["voters_pkey"]),
+    "voter_embedding": ((1, "VGG-Face"), [("face_embeddings_pkey", "face_embeddings_model_voter_idx")]),
+    "count_not_voted": ((), ["voters_not_voted_idx"]),
+}
+# Rows added (and rolled back) before EXPLAIN, so plans reflect a
+# constituency-sized roll rather than a near-empty table the planner would
+# rather scan.
+CHECK_ROWS = 50000
+CHECK_SEED = """
+    INSERT INTO image_blobs (sha256, data)
+    SELECT md5('check' || n) || md5('blob' || n), '\\x00'::bytea FROM generate_series(1, %(rows)s) AS n
+    ON CONFLICT (sha256) DO NOTHING;
+    INSERT INTO voters (name, image_hash, vote_status)
+    SELECT 'check voter ' || n, md5('check' || n) || md5('blob' || n), n %% 100 <> 0
+    FROM generate_series(1, %(rows)s) AS n;
+    INSERT INTO voter_thumbnails (voter_id, size, image)
+    SELECT id, 'booth', '\\x00'::bytea FROM voters WHERE name LIKE 'check voter %%'
+    ON CONFLICT (voter_id, size) DO NOTHING;
+    INSERT INTO face_embeddings (voter_id, model_name, embedding)
+    SELECT id, 'VGG-Face', '\\x00'::bytea FROM voters WHERE name LIKE 'check voter %%'
+    ON CONFLICT (voter_id, model_name) DO NOTHING;
+    ANALYZE voters, image_blobs, voter_thumbnails, face_embeddings;
+"""
+
+
+def available_migrations():
+    migrations = []
+    for filename in sorted(os.listdir(MIGRATIONS_DIR)):
+        match = MIGRATION_FILE.match(filename)
+        if match:
+            with open(os.path.join(MIGRATIONS_DIR, filename)) as f:
+                migrations.append((int(match.group(1)), match.group(2), f.read()))
+    return migrations
+
+
+def _statements(sql):
+    # CREATE INDEX CONCURRENTLY refuses to run inside the implicit transaction
+    # of a multi-statement query, so no-transaction files run one by one.
+    lines = [line for line in sql.splitlines() if not line.strip().startswith("--")]
+    return [statement.strip() for statement in "\n".join(lines).split(";") if statement.strip()]
+
+
+def drop_invalid_indexes(cur, sql):
+    # A CREATE INDEX CONCURRENTLY that failed part way leaves an INVALID
+    # index behind, which IF NOT EXISTS would then take as already built.
+    names = CREATED_INDEX.findall(sql)
+    if not names:
+        return
+    cur.execute(
+        """
+        SELECT c.relname FROM pg_index i JOIN pg_class c ON c.oid = i.indexrelid
+        WHERE NOT i.indisvalid AND c.relname = ANY(%s) AND pg_table_is_visible(c.oid)
+        """,
+        (names,)
+    )
+    for (index,) in cur.fetchall():
+        print(f"Dropping invalid index {index} left by an earlier failed run.")
+        cur.execute(pgsql.SQL("DROP INDEX CONCURRENTLY IF EXISTS {}").format(pgsql.Identifier(index)))
+
+
+def applied_versions(cur):
+    cur.execute("""
+        CREATE TABLE IF NOT EXISTS schema_migrations (
+            version INTEGER PRIMARY KEY,
+            name VARCHAR(100) NOT NULL,
+            applied_at TIMESTAMPTZ NOT NULL DEFAULT now()
+        )
+    """)
+    cur.execute("SELECT version FROM schema_migrations")
+    return {row[0] for row in cur.fetchall()}
+
+
+def migrate(target=None):
+    conn = db.connect()
+    conn.autocommit = True
+    cur = conn.cursor()
+    try:
+        cur.execute("SELECT pg_advisory_lock(%s)", (LOCK_ID,))
+        applied = applied_versions(cur)
+
+        for version, name, sql in available_migrations():
+            if version in applied or (target is not None and version > target):
+                continue
+
+            if sql.lstrip().startswith(NO_TRANSACTION):
+                drop_invalid_indexes(cur, sql)
+                for statement in _statements(sql):
+                    cur.execute(statement)
+                cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+            else:
+                conn.autocommit = False
+                try:
+                    cur.execute(sql)
+                    cur.execute("INSERT INTO schema_migrations (version, name) VALUES (%s, %s)", (version, name))
+                    conn.commit()
+                except psycopg2.Error:
+                    conn.rollback()
+                    raise
+                finally:
+                    conn.autocommit = True
+
+            print(f"Applied migration {version:04d}_{name}.")
+
+        cur.execute("SELECT pg_advisory_unlock(%s)", (LOCK_ID,))
+    finally:
+        cur.close()
+        conn.close()
+
+
+def show_status():
+    conn = db.connect()
+    cur = conn.cursor()
+    applied = applied_versions(cur)
+    conn.commit()
+    for version, name, _ in available_migrations():
+        state = "applied" if version in applied else "pending"
+        print(f"{version:04d}_{name}: {state}")
+    cur.close()
+    conn.close()
+
+
+def _used_indexes(plan, found):
+    if "Index Name" in plan:
+        found.add(plan["Index Name"])
+    for child in plan.get("Plans", []):
+        _used_indexes(child, found)
+    return found
+
+
+def check_indexes():
+    # Runs with the normal planner settings against a temporarily enlarged
+    # roll, and fails any query whose plan does not name the index it needs.
+    # Everything, including the ANALYZE, is rolled back afterwards.
+    conn = db.connect()
+    cur = conn.cursor()
+    failures = []
+    try:
+        cur.execute(CHECK_SEED, {"rows": CHECK_ROWS})
+        for name, (params, required) in CHECKED_QUERIES.items():
+            sql, bound = db.unprepared(name, params)
+            cur.execute("EXPLAIN (FORMAT JSON) " + sql, bound)
+            plan = cur.fetchone()[0]
+            if isinstance(plan, str):
+                plan = json.loads(plan)
+            used = _used_indexes(plan[0]["Plan"], set())
+            missing = [
+                " or ".join(index) if isinstance(index, tuple) else index
+                for index in required
+                if not used & (set(index) if isinstance(index, tuple) else {index})
+            ]
+            status = "OK" if not missing else f"NOT USING {', '.join(missing)}"
+            print(f"{name}: {status}")
+            if missing:
+                failures.append(name)
+    finally:
+        conn.rollback()
+        cur.close()
+        conn.close()
+    return failures
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Apply schema migrations to the evm_face database")
+    parser.add_argument("--target", type=int, default=None, help="stop after this migration version")
+    parser.add_argument("--status", action="store_true", help="list applied and pending migrations")
+    parser.add_argument("--check", action="store_true", help="EXPLAIN the hot queries and fail if one does not use its index")
+    args = parser.parse_args()
+
+    try:
+        if args.status:
+            show_status()
+        elif args.check:
+            if check_indexes():
+                raise SystemExit(1)
+        else:
+            migrate(args.target)
+    except psycopg2.Error as e:
+        print(f"Error running migrations: {e}")
+        raise SystemExit(1)
@@ -0,0 +1,19 @@
+CREATE TABLE IF NOT EXISTS voters (
+    id SERIAL PRIMARY KEY,
+    name VARCHAR(100) NOT NULL,
+    image BYTEA NOT NULL,
+    vote_status BOOLEAN DEFAULT FALSE
+);
+
+CREATE TABLE IF NOT EXISTS party (
+    id SERIAL PRIMARY KEY,
+    party_name VARCHAR(100) NOT NULL,
+    votes INTEGER DEFAULT 0
+);
+
+CREATE TABLE IF NOT EXISTS face_embeddings (
+    voter_id INTEGER NOT NULL REFERENCES voters(id) ON DELETE CASCADE,
+    model_name VARCHAR(50) NOT NULL,
+    embedding BYTEA NOT NULL,
+    PRIMARY KEY (voter_id, model_name)
+);
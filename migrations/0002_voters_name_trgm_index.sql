@@ -0,0 +1,5 @@
+-- migrate: no-transaction
+-- Serves search_voters: LOWER(name) LIKE '%term%' can't use a btree.
+CREATE EXTENSION IF NOT EXISTS pg_trgm;
+CREATE INDEX CONCURRENTLY IF NOT EXISTS voters_name_trgm_idx
+    ON voters USING gin (LOWER(name) gin_trgm_ops);
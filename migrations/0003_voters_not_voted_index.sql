@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+-- Only voters still to vote are indexed, so the index shrinks through the day.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS voters_not_voted_idx
+    ON voters (id) WHERE vote_status = FALSE;
@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+-- fetch_embeddings filters on model_name and pages by voter_id.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS face_embeddings_model_voter_idx
+    ON face_embeddings (model_name, voter_id);
@@ -0,0 +1,6 @@
+CREATE TABLE IF NOT EXISTS voter_thumbnails (
+    voter_id INTEGER NOT NULL REFERENCES voters(id) ON DELETE CASCADE,
+    size VARCHAR(20) NOT NULL,
+    image BYTEA NOT NULL,
+    PRIMARY KEY (voter_id, size)
+);
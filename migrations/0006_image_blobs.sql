@@ -0,0 +1,17 @@
+-- Photos move out of the hot voters rows into a content-addressed table,
+-- so status updates and scans of voters no longer drag TOAST data along.
+CREATE TABLE IF NOT EXISTS image_blobs (
+    sha256 CHAR(64) PRIMARY KEY,
+    data BYTEA NOT NULL
+);
+
+ALTER TABLE voters ADD COLUMN IF NOT EXISTS image_hash CHAR(64) REFERENCES image_blobs(sha256);
+
+INSERT INTO image_blobs (sha256, data)
+SELECT encode(sha256(image), 'hex'), image FROM voters
+ON CONFLICT (sha256) DO NOTHING;
+
+UPDATE voters SET image_hash = encode(sha256(image), 'hex') WHERE image_hash IS NULL;
+
+ALTER TABLE voters ALTER COLUMN image_hash SET NOT NULL;
+ALTER TABLE voters DROP COLUMN image;
@@ -0,0 +1,3 @@
+-- migrate: no-transaction
+-- DROP COLUMN only hides the old image data; rewrite the table to reclaim it.
+VACUUM FULL voters;
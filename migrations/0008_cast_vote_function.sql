@@ -0,0 +1,26 @@
+UPDATE voters SET vote_status = FALSE WHERE vote_status IS NULL;
+ALTER TABLE voters ALTER COLUMN vote_status SET NOT NULL;
+
+-- Flips the voter's status and counts the ballot in one call. The
+-- conditional UPDATE takes the voter's row lock, so when two booths race
+-- for the same voter the second re-checks vote_status after the first
+-- commits and gets FALSE back instead of counting a second ballot.
+CREATE OR REPLACE FUNCTION cast_vote(p_voter_id INTEGER, p_party_id INTEGER)
+RETURNS BOOLEAN AS $$
+BEGIN
+    UPDATE voters SET vote_status = TRUE
+    WHERE id = p_voter_id AND vote_status = FALSE;
+
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    UPDATE party SET votes = votes + 1 WHERE id = p_party_id;
+
+    IF NOT FOUND THEN
+        RAISE EXCEPTION 'unknown party %', p_party_id;
+    END IF;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
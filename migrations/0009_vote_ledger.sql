@@ -0,0 +1,53 @@
+-- Every ballot becomes a row in an append-only ledger, and party totals
+-- come from per-(party, booth) tally rows. A booth only ever updates its
+-- own tally rows, so booths no longer queue on the same few party rows.
+CREATE TABLE IF NOT EXISTS votes (
+    id BIGSERIAL PRIMARY KEY,
+    voter_id INTEGER NOT NULL UNIQUE,
+    party_id INTEGER NOT NULL REFERENCES party(id),
+    booth_id VARCHAR(50) NOT NULL,
+    cast_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
+
+CREATE TABLE IF NOT EXISTS vote_tally (
+    party_id INTEGER NOT NULL REFERENCES party(id) ON DELETE CASCADE,
+    booth_id VARCHAR(50) NOT NULL,
+    votes BIGINT NOT NULL DEFAULT 0,
+    PRIMARY KEY (party_id, booth_id)
+);
+
+-- Counts recorded before the ledger existed carry over as booth 'legacy'.
+INSERT INTO vote_tally (party_id, booth_id, votes)
+SELECT id, 'legacy', votes FROM party WHERE votes > 0
+ON CONFLICT (party_id, booth_id) DO NOTHING;
+
+ALTER TABLE party DROP COLUMN votes;
+
+CREATE OR REPLACE VIEW party_results AS
+SELECT p.id, p.party_name, COALESCE(sum(t.votes), 0)::BIGINT AS votes
+FROM party p
+LEFT JOIN vote_tally t ON t.party_id = p.id
+GROUP BY p.id, p.party_name;
+
+DROP FUNCTION IF EXISTS cast_vote(INTEGER, INTEGER);
+
+CREATE OR REPLACE FUNCTION cast_vote(p_voter_id INTEGER, p_party_id INTEGER, p_booth_id VARCHAR)
+RETURNS BOOLEAN AS $$
+BEGIN
+    UPDATE voters SET vote_status = TRUE
+    WHERE id = p_voter_id AND vote_status = FALSE;
+
+    IF NOT FOUND THEN
+        RETURN FALSE;
+    END IF;
+
+    INSERT INTO votes (voter_id, party_id, booth_id)
+    VALUES (p_voter_id, p_party_id, p_booth_id);
+
+    INSERT INTO vote_tally (party_id, booth_id, votes)
+    VALUES (p_party_id, p_booth_id, 1)
+    ON CONFLICT (party_id, booth_id) DO UPDATE SET votes = vote_tally.votes + 1;
+
+    RETURN TRUE;
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,17 @@
+-- Announces each ballot on the vote_cast channel when its transaction
+-- commits. txid lets a listener tell whether a ballot was already part of
+-- the snapshot it loaded the totals from.
+CREATE OR REPLACE FUNCTION notify_vote_cast() RETURNS TRIGGER AS $$
+BEGIN
+    PERFORM pg_notify('vote_cast', json_build_object(
+        'party_id', NEW.party_id,
+        'booth_id', NEW.booth_id,
+        'txid', txid_current()
+    )::text);
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS votes_notify ON votes;
+CREATE TRIGGER votes_notify AFTER INSERT ON votes
+FOR EACH ROW EXECUTE PROCEDURE notify_vote_cast();
@@ -0,0 +1,41 @@
+-- Booths record ballots locally first and upload them later. Each ballot
+-- carries a booth-generated UUID so a batch that is retried after a lost
+-- reply is recognised instead of being counted twice.
+ALTER TABLE votes ADD COLUMN IF NOT EXISTS vote_uuid UUID UNIQUE;
+
+-- Returns 'ok', 'duplicate' (this ballot was already uploaded),
+-- 'already_voted' (the voter voted at another booth first) or 'rejected'
+-- (unknown voter or party). Never raises for these, so one bad ballot does
+-- not fail the rest of its batch.
+CREATE OR REPLACE FUNCTION sync_vote(p_vote_uuid UUID, p_voter_id INTEGER, p_party_id INTEGER,
+                                     p_booth_id VARCHAR, p_cast_at TIMESTAMPTZ)
+RETURNS TEXT AS $$
+BEGIN
+    IF EXISTS (SELECT 1 FROM votes WHERE vote_uuid = p_vote_uuid) THEN
+        RETURN 'duplicate';
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM party WHERE id = p_party_id) THEN
+        RETURN 'rejected';
+    END IF;
+
+    UPDATE voters SET vote_status = TRUE
+    WHERE id = p_voter_id AND vote_status = FALSE;
+
+    IF NOT FOUND THEN
+        IF EXISTS (SELECT 1 FROM voters WHERE id = p_voter_id) THEN
+            RETURN 'already_voted';
+        END IF;
+        RETURN 'rejected';
+    END IF;
+
+    INSERT INTO votes (voter_id, party_id, booth_id, cast_at, vote_uuid)
+    VALUES (p_voter_id, p_party_id, p_booth_id, p_cast_at, p_vote_uuid);
+
+    INSERT INTO vote_tally (party_id, booth_id, votes)
+    VALUES (p_party_id, p_booth_id, 1)
+    ON CONFLICT (party_id, booth_id) DO UPDATE SET votes = vote_tally.votes + 1;
+
+    RETURN 'ok';
+END;
+$$ LANGUAGE plpgsql;
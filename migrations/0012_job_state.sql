@@ -0,0 +1,8 @@
+-- Checkpoints for long-running batch jobs (bulk import, embedding
+-- backfill). A job saves its state in the same transaction as the batch
+-- it just wrote, so a resumed job neither skips nor repeats rows.
+CREATE TABLE IF NOT EXISTS job_state (
+    job VARCHAR(100) PRIMARY KEY,
+    state JSONB NOT NULL,
+    updated_at TIMESTAMPTZ NOT NULL DEFAULT now()
+);
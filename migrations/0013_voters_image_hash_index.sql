@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+-- Lets re-encoding find blobs no voter points at any more without
+-- scanning voters once per blob.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS voters_image_hash_idx ON voters (image_hash);
@@ -0,0 +1,20 @@
+-- Every insert or update of an embedding takes a new seq, so face indexes
+-- can pick up re-embeds and embeddings backfilled for older voters, not
+-- just voters with a higher id than the last one indexed.
+CREATE SEQUENCE IF NOT EXISTS face_embeddings_seq;
+
+ALTER TABLE face_embeddings
+    ADD COLUMN IF NOT EXISTS seq BIGINT NOT NULL DEFAULT nextval('face_embeddings_seq');
+
+ALTER SEQUENCE face_embeddings_seq OWNED BY face_embeddings.seq;
+
+CREATE OR REPLACE FUNCTION bump_face_embedding_seq() RETURNS TRIGGER AS $$
+BEGIN
+    NEW.seq := nextval('face_embeddings_seq');
+    RETURN NEW;
+END;
+$$ LANGUAGE plpgsql;
+
+DROP TRIGGER IF EXISTS face_embeddings_bump_seq ON face_embeddings;
+CREATE TRIGGER face_embeddings_bump_seq BEFORE UPDATE ON face_embeddings
+FOR EACH ROW EXECUTE PROCEDURE bump_face_embedding_seq();
@@ -0,0 +1,4 @@
+-- migrate: no-transaction
+-- fetch_embeddings pages by seq within a model.
+CREATE INDEX CONCURRENTLY IF NOT EXISTS face_embeddings_model_seq_idx
+    ON face_embeddings (model_name, seq);
@@ -0,0 +1,48 @@
+-- A ballot that still fails inside sync_vote (a unique or foreign key
+-- violation that slipped past the checks) must not roll back the rest of
+-- its batch. The EXCEPTION block runs each call in its own subtransaction
+-- and turns the failure into an outcome.
+CREATE OR REPLACE FUNCTION sync_vote(p_vote_uuid UUID, p_voter_id INTEGER, p_party_id INTEGER,
+                                     p_booth_id VARCHAR, p_cast_at TIMESTAMPTZ)
+RETURNS TEXT AS $$
+DECLARE
+    v_constraint TEXT;
+BEGIN
+    IF EXISTS (SELECT 1 FROM votes WHERE vote_uuid = p_vote_uuid) THEN
+        RETURN 'duplicate';
+    END IF;
+
+    IF NOT EXISTS (SELECT 1 FROM party WHERE id = p_party_id) THEN
+        RETURN 'rejected';
+    END IF;
+
+    UPDATE voters SET vote_status = TRUE
+    WHERE id = p_voter_id AND vote_status = FALSE;
+
+    IF NOT FOUND THEN
+        IF EXISTS (SELECT 1 FROM voters WHERE id = p_voter_id) THEN
+            RETURN 'already_voted';
+        END IF;
+        RETURN 'rejected';
+    END IF;
+
+    INSERT INTO votes (voter_id, party_id, booth_id, cast_at, vote_uuid)
+    VALUES (p_voter_id, p_party_id, p_booth_id, p_cast_at, p_vote_uuid);
+
+    INSERT INTO vote_tally (party_id, booth_id, votes)
+    VALUES (p_party_id, p_booth_id, 1)
+    ON CONFLICT (party_id, booth_id) DO UPDATE SET votes = vote_tally.votes + 1;
+
+    RETURN 'ok';
+EXCEPTION
+    WHEN unique_violation THEN
+        GET STACKED DIAGNOSTICS v_constraint = CONSTRAINT_NAME;
+        IF v_constraint = 'votes_vote_uuid_key' THEN
+            RETURN 'duplicate';
+        END IF;
+        -- votes.voter_id: the ledger already holds a ballot for this voter.
+        RETURN 'already_voted';
+    WHEN OTHERS THEN
+        RETURN 'rejected';
+END;
+$$ LANGUAGE plpgsql;
@@ -0,0 +1,120 @@
+from array import array
+import numpy as np
+
+SCAN_LIMIT = 65536
+
+
+def _grams(name, n):
+    return {name[i:i + n] for i in range(len(name) - n + 1)}
+
+
+class NameIndex:
+    # Substring search over the roll's names. Every 1-, 2- and 3-character
+    # substring maps to the sorted positions of the names containing it;
+    # longer terms intersect their trigram postings and then confirm the
+    # match on the few remaining candidates.
+    def __init__(self, rows):
+        ids = []
+        names = []
+        statuses = []
+        postings = {}
+
+        for position, (voter_id, name, vote_status) in enumerate(rows):
+            ids.append(voter_id)
+            names.append(name)
+            statuses.append(bool(vote_status))
+            lowered = name.lower()
+            for n in (1, 2, 3):
+                for gram in _grams(lowered, n):
+                    posting = postings.get(gram)
+                    if posting is None:
+                        posting = postings[gram] = array("i")
+                    posting.append(position)
+
+        self.ids = np.array(ids, dtype=np.int64)
+        self.names = names
+        self.encoded = np.array([name.lower().encode("utf-8") for name in names], dtype=bytes)
+        self.statuses = np.array(statuses, dtype=bool)
+        self.positions_by_id = {voter_id: position for position, voter_id in enumerate(ids)}
+        self.postings = {gram: np.frombuffer(posting, dtype=np.int32) for gram, posting in postings.items()}
+        self.empty = np.empty(0, dtype=np.int32)
+
+    @classmethod
+    def from_cursor(cls, cur):
+        return cls(row for row in cur)
+
+    def __len__(self):
+        return len(self.ids)
+
+    def _intersect(self, a, b):
+        # Both inputs are sorted position arrays; a boolean mask over the
+        # roll keeps this linear rather than sort-based like np.intersect1d.
+        small, large = (a, b) if len(a) <= len(b) else (b, a)
+        mask = np.zeros(len(self.ids), dtype=bool)
+        mask[small] = True
+        return large[mask[large]]
+
+    def _filter(self, candidates, term):
+        if len(candidates) == 0:
+            return candidates
+        found = np.char.find(self.encoded[candidates], term.encode("utf-8")) >= 0
+        return candidates[found]
+
+    def search(self, term, previous=None):
+        # `previous` is (term, positions) from the last keystroke; when the new
+        # term contains it, only those positions can still match.
+        term = term.lower()
+        candidates = None
+        grams_from = term
+
+        if len(term) <= 3:
+            # Short terms have their own exact posting list, so there is
+            # nothing to intersect or confirm.
+            return self.postings.get(term, self.empty)
+
+        if previous is not None and previous[0] and previous[0] in term:
+            candidates = previous[1]
+            if len(candidates) <= SCAN_LIMIT:
+                return self._filter(candidates, term)
+            if term.startswith(previous[0]):
+                # Typing forward: only trigrams reaching past the old term are new.
+                grams_from = term[max(0, len(previous[0]) - 2):]
+
+        postings = sorted((self.postings.get(gram, self.empty) for gram in _grams(grams_from, 3)), key=len)
+        result = candidates
+        for posting in postings:
+            result = posting if result is None else self._intersect(result, posting)
+            if len(result) <= SCAN_LIMIT:
+                break
+        return self._filter(result, term)
+
+    def rows(self, positions):
+        return [(int(self.ids[p]), self.names[p], bool(self.statuses[p])) for p in positions]
+
+    def set_status(self, voter_id, vote_status):
+        position = self.positions_by_id.get(voter_id)
+        if position is not None:
+            self.statuses[position] = vote_status
+
+
+class IndexVoterSource:
+    # VirtualVoterList source over a search result held as name index positions.
+    def __init__(self, index, positions):
+        self.index = index
+        self.positions = positions
+
+    def __len__(self):
+        return len(self.positions)
+
+    def fetch(self, offset, limit):
+        return self.index.rows(self.positions[offset:offset + limit])
+
+    def position(self, voter_id):
+        target = self.index.positions_by_id.get(voter_id)
+        if target is None:
+            return None
+        i = int(np.searchsorted(self.positions, target))
+        return i if i < len(self.positions) and self.positions[i] == target else None
+
+    def set_status(self, voter_id, vote_status):
+        self.index.set_status(voter_id, vote_status)
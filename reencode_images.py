@@ -0,0 +1,101 @@
+import argparse
+import io
+import os
+from multiprocessing import Pool
+import psycopg2
+from psycopg2.extras import execute_values
+from PIL import Image
+import db
+import image_codec
+import image_store
+import job_state
+
+CHUNK_SIZE = 500
+JOB = "reencode_images"
+
+
+def reencode(task):
+    voter_id, data, fmt, quality, face_crop = task
+    # Photos already in the target format are left alone, so re-running the
+    # job never compounds lossy compression or crops a face twice.
+    if image_codec.image_format(data) == fmt:
+        return voter_id, None, 0
+    new_data = image_codec.encode_photo(Image.open(io.BytesIO(data)), fmt, quality, face_crop)
+    if len(new_data) >= len(data):
+        return voter_id, None, 0
+    return voter_id, new_data, len(data) - len(new_data)
+
+
+def reencode_chunk(cur, pool, after_id, limit, fmt, quality, face_crop):
+    cur.execute(
+        """
+        SELECT v.id, v.image_hash, b.data FROM voters v
+        JOIN image_blobs b ON b.sha256 = v.image_hash
+        WHERE v.id > %s ORDER BY v.id LIMIT %s
+        """,
+        (after_id, limit)
+    )
+    rows = cur.fetchall()
+    if not rows:
+        return None, 0, 0
+
+    old_hashes = {voter_id: image_hash for voter_id, image_hash, _ in rows}
+    results = pool.map(reencode, [(voter_id, bytes(data), fmt, quality, face_crop) for voter_id, _, data in rows])
+
+    updates, saved = [], 0
+    for voter_id, new_data, saving in results:
+        if new_data is None:
+            continue
+        updates.append((voter_id, image_store.store_image(cur, new_data)))
+        saved += saving
+
+    if updates:
+        execute_values(cur, "UPDATE voters v SET image_hash = u.hash FROM (VALUES %s) AS u(id, hash) WHERE v.id = u.id",
+                       updates)
+        cur.execute(
+            """
+            DELETE FROM image_blobs b WHERE b.sha256 = ANY(%s)
+            AND NOT EXISTS (SELECT 1 FROM voters v WHERE v.image_hash = b.sha256)
+            """,
+            (list({old_hashes[voter_id] for voter_id, _ in updates}),)
+        )
+    return rows[-1][0], len(updates), saved
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Re-encode stored voter photos with the configured image codec")
+    parser.add_argument("--format", choices=list(image_codec.FORMATS), default=image_codec.IMAGE_FORMAT)
+    parser.add_argument("--quality", type=int, default=image_codec.IMAGE_QUALITY)
+    parser.add_argument("--face-crop", action="store_true", default=image_codec.FACE_CROP)
+    parser.add_argument("--workers", type=int, default=os.cpu_count())
+    parser.add_argument("--chunk-size", type=int, default=CHUNK_SIZE)
+    parser.add_argument("--restart", action="store_true", help="discard the watermark and rescan from the start")
+    args = parser.parse_args()
+
+    try:
+        with db.cursor() as cur:
+            if args.restart:
+                job_state.clear_state(cur, JOB)
+            state = job_state.load_state(cur, JOB)
+
+        watermark = state.get("watermark", 0)
+        converted = state.get("converted", 0)
+        saved = state.get("saved", 0)
+
+        with Pool(args.workers) as pool:
+            while True:
+                # Each chunk commits together with its watermark.
+                with db.cursor() as cur:
+                    last_id, count, chunk_saved = reencode_chunk(
+                        cur, pool, watermark, args.chunk_size, args.format, args.quality, args.face_crop
+                    )
+                    if last_id is None:
+                        break
+                    watermark, converted, saved = last_id, converted + count, saved + chunk_saved
+                    job_state.save_state(cur, JOB, {"watermark": watermark, "converted": converted, "saved": saved})
+                print(f"voter {watermark}: {converted} photos re-encoded, {saved / 1e6:.1f} MB saved")
+
+        print(f"Done: {converted} photos re-encoded, {saved / 1e6:.1f} MB saved. "
+              "Run VACUUM on image_blobs to return the space.")
+    except psycopg2.Error as e:
+        print(f"Error re-encoding images: {e}")
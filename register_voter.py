@@ -3,7 +3,13 @@ from tkinter import ttk, messagebox
 import cv2
 import psycopg2
 from PIL import Image, ImageTk
-import io
+import numpy as np
+import db
+import face_store
+import image_codec
+import image_store
+import thumbnails
+from face_model import FaceModelManager
 
 class VoterRegistrationApp(tk.Tk):
     def __init__(self):
@@ -29,7 +35,9 @@ class VoterRegistrationApp(tk.Tk):
         self.style.configure("TEntry", 
                              font=("Helvetica", 12))
 
+        self.face_model = FaceModelManager()
         self.create_widgets()
+        self.face_model.start_warmup()
 
     def create_widgets(self):
         main_frame = ttk.Frame(self, padding="30 30 30 30")
@@ -87,26 +95,21 @@ class VoterRegistrationApp(tk.Tk):
             return
 
         try:
-            conn = psycopg2.connect(
-                dbname="evm_face",
-                user="postgres",
-                password="12345678",
-                host="localhost"
-            )
-            cur = conn.cursor()
-
-            img_byte_arr = io.BytesIO()
-            self.photo.save(img_byte_arr, format='PNG')
-            img_byte_arr = img_byte_arr.getvalue()
-
-            cur.execute(
-                "INSERT INTO voters (name, image) VALUES (%s, %s)",
-                (name, psycopg2.Binary(img_byte_arr))
-            )
-
-            conn.commit()
-            cur.close()
-            conn.close()
+            img_byte_arr = image_codec.encode_photo(self.photo)
+
+            image_bgr = cv2.cvtColor(np.array(self.photo), cv2.COLOR_RGB2BGR)
+            embedding = self.face_model.embed(image_bgr)
+
+            with db.cursor() as cur:
+                digest = image_store.store_image(cur, img_byte_arr)
+                cur.execute(
+                    "INSERT INTO voters (name, image_hash) VALUES (%s, %s) RETURNING id",
+                    (name, digest)
+                )
+                voter_id = cur.fetchone()[0]
+
+                face_store.save_embedding(cur, voter_id, embedding)
+                thumbnails.save_thumbnails(cur, voter_id, self.photo)
 
             messagebox.showinfo("Success", "Voter registered successfully!")
             self.name_entry.delete(0, tk.END)
@@ -115,6 +118,8 @@ class VoterRegistrationApp(tk.Tk):
 
         except psycopg2.Error as e:
             messagebox.showerror("Error", f"Failed to register voter: {e}")
+        except (ValueError, RuntimeError) as e:
+            messagebox.showerror("Error", f"Failed to compute face embedding: {e}")
 
 if __name__ == "__main__":
     app = VoterRegistrationApp()
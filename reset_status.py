@@ -1,28 +1,14 @@
-import psycopg2
-
-DB_HOST = "localhost"
-DB_NAME = "evm_face"
-DB_USER = "postgres"
-DB_PASSWORD = "12345678"
+import db
 
 try:
-    connection = psycopg2.connect(
-        host=DB_HOST,
-        database=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-    )
-    cursor = connection.cursor()
-
-    cursor.execute("UPDATE voters SET vote_status = FALSE")
+    with db.cursor() as cursor:
+        # Each voter can hold only one ballot in the ledger, so the ballots
+        # go together with the statuses or the next vote would be refused.
+        cursor.execute("UPDATE voters SET vote_status = FALSE")
+        cursor.execute("DELETE FROM votes")
+        cursor.execute("DELETE FROM vote_tally")
 
-    connection.commit()
-    print("Vote status reset to FALSE for all voters.")
+    print("Vote status reset to FALSE for all voters and all ballots cleared.")
 
 except Exception as e:
     print("Error:", e)
-
-finally:
-    if connection:
-        cursor.close()
-        connection.close()
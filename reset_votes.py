@@ -1,28 +1,11 @@
-import psycopg2
-
-DB_HOST = "localhost"
-DB_NAME = "evm_face"
-DB_USER = "postgres"
-DB_PASSWORD = "12345678"
+import db
 
 try:
-    connection = psycopg2.connect(
-        host=DB_HOST,
-        database=DB_NAME,
-        user=DB_USER,
-        password=DB_PASSWORD,
-    )
-    cursor = connection.cursor()
-
-    cursor.execute("UPDATE party SET votes = 0")
+    with db.cursor() as cursor:
+        cursor.execute("DELETE FROM votes")
+        cursor.execute("DELETE FROM vote_tally")
 
-    connection.commit()
     print("Votes reset to 0 for all parties.")
 
 except Exception as e:
     print("Error:", e)
-
-finally:
-    if connection:
-        cursor.close()
-        connection.close()
@@ -0,0 +1,150 @@
+import json
+import queue
+import select
+import threading
+import tkinter as tk
+from tkinter import ttk
+import psycopg2
+from psycopg2.extensions import ISOLATION_LEVEL_AUTOCOMMIT, ISOLATION_LEVEL_REPEATABLE_READ
+import db
+
+CHANNEL = "vote_cast"
+
+
+def _visible_in(snapshot, txid):
+    # txid_current_snapshot() text is "xmin:xmax:xip,xip,..."
+    xmin, xmax, xip = snapshot.split(":")
+    if txid < int(xmin):
+        return True
+    if txid >= int(xmax):
+        return False
+    return str(txid) not in xip.split(",")
+
+
+class ResultsListener:
+    # Holds a dedicated connection LISTENing on vote_cast and turns each
+    # notification into a ("vote", party_id, booth_id) event. Ballots already
+    # counted in the snapshot are skipped, so totals never double count.
+    def __init__(self, events):
+        self.events = events
+        self._running = threading.Event()
+        self._thread = None
+
+    def start(self):
+        self._running.set()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+
+    def stop(self):
+        self._running.clear()
+
+    def _snapshot(self, conn):
+        conn.set_isolation_level(ISOLATION_LEVEL_REPEATABLE_READ)
+        cur = conn.cursor()
+        cur.execute("SELECT txid_current_snapshot()::text")
+        snapshot = cur.fetchone()[0]
+        cur.execute("SELECT id, party_name, votes FROM party_results")
+        parties = cur.fetchall()
+        cur.execute("SELECT count(*), count(*) FILTER (WHERE vote_status) FROM voters")
+        total_voters, voted = cur.fetchone()
+        cur.execute("SELECT DISTINCT booth_id FROM vote_tally")
+        booths = {row[0] for row in cur.fetchall()}
+        cur.close()
+        conn.commit()
+        conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+        return snapshot, parties, total_voters, voted, booths
+
+    def _run(self):
+        while self._running.is_set():
+            try:
+                conn = db.connect()
+                conn.set_isolation_level(ISOLATION_LEVEL_AUTOCOMMIT)
+                conn.cursor().execute(f"LISTEN {CHANNEL}")
+                # LISTEN first, then snapshot: nothing can slip between the two.
+                snapshot, *state = self._snapshot(conn)
+                self.events.put(("snapshot", *state))
+
+                while self._running.is_set():
+                    if select.select([conn], [], [], 1.0) == ([], [], []):
+                        continue
+                    conn.poll()
+                    while conn.notifies:
+                        payload = json.loads(conn.notifies.pop(0).payload)
+                        if not _visible_in(snapshot, payload["txid"]):
+                            self.events.put(("vote", payload["party_id"], payload["booth_id"]))
+                conn.close()
+            except psycopg2.Error as e:
+                self.events.put(("error", e))
+                self._running.wait(5)
+
+
+class ResultsDashboard(tk.Toplevel):
+    def __init__(self, parent):
+        super().__init__(parent)
+        self.title("Live Results")
+        self.geometry("480x500")
+
+        self.events = queue.Queue()
+        self.votes = {}
+        self.names = {}
+        self.labels = {}
+        self.booths = set()
+        self.total_voters = 0
+        self.voted = 0
+
+        ttk.Label(self, text="Live Results", font=("Helvetica", 18, "bold")).pack(pady=(20, 10))
+        self.turnout_label = ttk.Label(self, text="Connecting...", font=("Helvetica", 12))
+        self.turnout_label.pack(pady=5)
+        self.party_frame = ttk.Frame(self)
+        self.party_frame.pack(fill=tk.BOTH, expand=True, padx=20, pady=10)
+
+        self.listener = ResultsListener(self.events)
+        self.listener.start()
+        self.protocol("WM_DELETE_WINDOW", self.close)
+        self.apply_events()
+
+    def apply_events(self):
+        changed = False
+        while not self.events.empty():
+            event = self.events.get_nowait()
+            if event[0] == "snapshot":
+                _, parties, self.total_voters, self.voted, self.booths = event
+                self.names = {party_id: name for party_id, name, _ in parties}
+                self.votes = {party_id: votes for party_id, _, votes in parties}
+                changed = True
+            elif event[0] == "vote":
+                _, party_id, booth_id = event
+                self.votes[party_id] = self.votes.get(party_id, 0) + 1
+                self.voted += 1
+                self.booths.add(booth_id)
+                changed = True
+            elif event[0] == "error":
+                self.turnout_label.config(text=f"Reconnecting: {event[1]}")
+
+        # Many notifications between two polls are folded into one redraw.
+        if changed:
+            self.redraw()
+        self.apply_job = self.after(250, self.apply_events)
+
+    def redraw(self):
+        total_votes = sum(self.votes.values())
+        turnout = (self.voted / self.total_voters * 100) if self.total_voters else 0
+        self.turnout_label.config(
+            text=f"Turnout: {self.voted} / {self.total_voters} ({turnout:.1f}%)  |  "
+                 f"Booths reporting: {len(self.booths)}"
+        )
+
+        ranked = sorted(self.votes, key=lambda party_id: self.votes[party_id], reverse=True)
+        for row, party_id in enumerate(ranked):
+            label = self.labels.get(party_id)
+            if label is None:
+                label = self.labels[party_id] = ttk.Label(self.party_frame, font=("Helvetica", 12))
+            votes = self.votes[party_id]
+            percentage = (votes / total_votes * 100) if total_votes > 0 else 0
+            label.config(text=f"{self.names.get(party_id, party_id)}: {votes} votes ({percentage:.1f}%)")
+            label.grid(row=row, column=0, sticky="w", pady=3)
+
+    def close(self):
+        self.after_cancel(self.apply_job)
+        self.listener.stop()
+        self.destroy()
@@ -0,0 +1,104 @@
+import argparse
+import random
+import threading
+import time
+from collections import Counter
+import psycopg2
+import db
+import image_store
+import voting
+
+PARTY_NAME = "stress-test"
+
+
+def seed(cur, voters):
+    digest = image_store.store_image(cur, b"stress-test")
+    cur.execute("INSERT INTO party (party_name) VALUES (%s) RETURNING id", (PARTY_NAME,))
+    party_id = cur.fetchone()[0]
+    cur.execute(
+        """
+        INSERT INTO voters (name, image_hash)
+        SELECT 'stress-test ' || n, %s FROM generate_series(1, %s) AS n
+        RETURNING id
+        """,
+        (digest, voters)
+    )
+    return party_id, [row[0] for row in cur.fetchall()]
+
+
+def cleanup(cur, party_id, voter_ids):
+    cur.execute("DELETE FROM votes WHERE voter_id = ANY(%s)", (voter_ids,))
+    cur.execute("DELETE FROM voters WHERE id = ANY(%s)", (voter_ids,))
+    cur.execute("DELETE FROM party WHERE id = %s", (party_id,))
+
+
+def booth(booth_no, voter_ids, party_id, attempts, successes, errors, start_gate):
+    # Each booth has its own connection, like a separate machine would.
+    rng = random.Random(booth_no)
+    order = [voter_id for voter_id in voter_ids for _ in range(attempts)]
+    rng.shuffle(order)
+
+    conn = db.connect()
+    conn.autocommit = False
+    cur = conn.cursor()
+    start_gate.wait()
+    try:
+        for voter_id in order:
+            try:
+                if voting.commit_vote(cur, voter_id, party_id, f"stress-{booth_no}"):
+                    successes.append(voter_id)
+                conn.commit()
+            except psycopg2.Error as e:
+                conn.rollback()
+                errors.append(str(e))
+    finally:
+        cur.close()
+        conn.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Many simulated booths casting votes for the same roll at once")
+    parser.add_argument("--voters", type=int, default=2000)
+    parser.add_argument("--booths", type=int, default=32)
+    parser.add_argument("--attempts", type=int, default=2, help="times each booth tries every voter")
+    args = parser.parse_args()
+
+    with db.cursor() as cur:
+        party_id, voter_ids = seed(cur, args.voters)
+
+    successes = []
+    errors = []
+    start_gate = threading.Barrier(args.booths + 1)
+    threads = [
+        threading.Thread(target=booth, args=(n, voter_ids, party_id, args.attempts, successes, errors, start_gate))
+        for n in range(args.booths)
+    ]
+    for thread in threads:
+        thread.start()
+    start_gate.wait()
+    started = time.perf_counter()
+    for thread in threads:
+        thread.join()
+    elapsed = time.perf_counter() - started
+
+    try:
+        with db.cursor() as cur:
+            cur.execute("SELECT votes FROM party_results WHERE id = %s", (party_id,))
+            counted = cur.fetchone()[0]
+            cur.execute("SELECT count(*) FROM voters WHERE id = ANY(%s) AND vote_status", (voter_ids,))
+            flipped = cur.fetchone()[0]
+
+        attempts = args.voters * args.booths * args.attempts
+        duplicates = [voter_id for voter_id, n in Counter(successes).items() if n > 1]
+        print(f"{attempts} attempts from {args.booths} booths in {elapsed:.2f} s "
+              f"({attempts / elapsed:.0f} calls/s, {len(successes) / elapsed:.0f} votes/s)")
+        print(f"accepted={len(successes)} counted={counted} flipped={flipped} "
+              f"duplicates={len(duplicates)} errors={len(errors)}")
+
+        ok = (len(successes) == counted == flipped == args.voters and not duplicates and not errors)
+        print("PASS" if ok else "FAIL")
+    finally:
+        with db.cursor() as cur:
+            cleanup(cur, party_id, voter_ids)
+
+    raise SystemExit(0 if ok else 1)
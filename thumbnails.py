@@ -0,0 +1,68 @@
+import io
+from collections import OrderedDict
+import psycopg2
+from PIL import Image
+import db
+
+# Display sizes used by evm_7.py and display_voters.py.
+SIZES = {
+    "booth": (300, 300),
+    "display": (300, 225),
+}
+QUALITY = 85
+
+
+def encode_thumbnail(image, size):
+    buffer = io.BytesIO()
+    image.convert("RGB").resize(SIZES[size]).save(buffer, format="JPEG", quality=QUALITY)
+    return buffer.getvalue()
+
+
+def save_thumbnails(cur, voter_id, image):
+    for size in SIZES:
+        cur.execute(
+            """
+            INSERT INTO voter_thumbnails (voter_id, size, image) VALUES (%s, %s, %s)
+            ON CONFLICT (voter_id, size) DO UPDATE SET image = EXCLUDED.image
+            """,
+            (voter_id, size, psycopg2.Binary(encode_thumbnail(image, size)))
+        )
+
+
+def load_thumbnail(cur, voter_id, size):
+    # Returns (thumbnail image, vote_status). Voters enrolled before thumbnails
+    # existed get theirs generated from the original on first view.
+    db.execute(cur, "voter_thumbnail", (voter_id, size))
+    row = cur.fetchone()
+    if row is None:
+        return None, None
+    data, vote_status = row
+
+    if data is None:
+        db.execute(cur, "voter_image", (voter_id,))
+        original = Image.open(io.BytesIO(cur.fetchone()[0]))
+        save_thumbnails(cur, voter_id, original)
+        data = encode_thumbnail(original, size)
+
+    return Image.open(io.BytesIO(data)), vote_status
+
+
+class LRUCache:
+    def __init__(self, max_entries=256):
+        self.max_entries = max_entries
+        self.entries = OrderedDict()
+
+    def get(self, key):
+        value = self.entries.get(key)
+        if value is not None:
+            self.entries.move_to_end(key)
+        return value
+
+    def put(self, key, value):
+        self.entries[key] = value
+        self.entries.move_to_end(key)
+        while len(self.entries) > self.max_entries:
+            self.entries.popitem(last=False)
+
+    def discard(self, key):
+        self.entries.pop(key, None)
@@ -0,0 +1,316 @@
+import tkinter as tk
+from tkinter import ttk
+from collections import OrderedDict
+import db
+
+PAGE_SIZE = 200
+MAX_CACHED_PAGES = 16
+
+
+class DbVoterSource:
+    # Keyset-paginated view of the whole roll. Each page is fetched with
+    # "id > last id of the previous page", so a page costs the same no
+    # matter how deep into the roll it is. Nothing here counts the roll:
+    # the total starts as the planner's estimate (or the name index's
+    # length) and is corrected as the real ends of the roll are reached.
+    def __init__(self, page_size=PAGE_SIZE, total=None):
+        self.page_size = page_size
+        self.pages = OrderedDict()
+        self.anchors = {0: 0}
+        # Set once position() has placed a page by estimate rather than by count.
+        self.located = False
+        if total is None:
+            with db.cursor() as cur:
+                db.execute(cur, "estimate_voters")
+                total = cur.fetchone()[0]
+                if total < 0:
+                    db.execute(cur, "count_voters")
+                    total = cur.fetchone()[0]
+        self.total = total
+
+    def __len__(self):
+        return self.total
+
+    def _reset(self):
+        self.pages.clear()
+        self.anchors = {0: 0}
+        self.located = False
+
+    def _anchor(self, cur, page):
+        if page in self.anchors:
+            return self.anchors[page]
+
+        below = [p for p in self.anchors if p < page]
+        if below and page - max(below) <= 4:
+            for p in range(max(below), page):
+                self._page(cur, p)
+            return self.anchors[page]
+
+        above = [p for p in self.anchors if p > page]
+        if above and min(above) - page <= 4:
+            # Scrolling back up from a located voter, one keyset step a page.
+            for p in range(min(above), page, -1):
+                db.execute(cur, "voter_id_before", (self.anchors[p], self.page_size))
+                row = cur.fetchone()
+                if row is None:
+                    # The roll starts sooner than the estimate placed the
+                    # voter: start over from the top, where offsets are exact.
+                    self._reset()
+                    return self._anchor(cur, page)
+                self.anchors[p - 1] = row[0]
+            return self.anchors[page]
+
+        if self.located:
+            # A jump away from a located voter: go back to counted offsets
+            # rather than mix them with estimated ones.
+            self._reset()
+            return self._anchor(cur, page)
+
+        # Jumping far ahead (scrollbar drag): one OFFSET query finds the
+        # boundary id. It still steps over that many primary key entries, but
+        # as an index-only scan, without fetching the pages in between. Past
+        # the end of the roll the estimate was too high: count once to fix
+        # the total, and the page comes back empty.
+        db.execute(cur, "voter_id_at", (page * self.page_size - 1,))
+        row = cur.fetchone()
+        if row is None:
+            db.execute(cur, "count_voters")
+            self.total = cur.fetchone()[0]
+            db.execute(cur, "last_voter_id")
+            row = cur.fetchone()
+        self.anchors[page] = row[0]
+        return self.anchors[page]
+
+    def _page(self, cur, page):
+        if page in self.pages:
+            self.pages.move_to_end(page)
+            return self.pages[page]
+
+        anchor = self._anchor(cur, page)
+        db.execute(cur, "voter_page", (anchor, self.page_size))
+        rows = cur.fetchall()
+        self.pages[page] = rows
+        # An empty page (rows deleted, or past the end) leaves the next one
+        # starting from the same id.
+        self.anchors[page + 1] = rows[-1][0] if rows else anchor
+        if len(rows) < self.page_size:
+            self.total = min(self.total, page * self.page_size + len(rows))
+        else:
+            self.total = max(self.total, (page + 1) * self.page_size)
+        while len(self.pages) > MAX_CACHED_PAGES:
+            self.pages.popitem(last=False)
+        return rows
+
+    def fetch(self, offset, limit):
+        first = offset // self.page_size
+        last = (offset + limit - 1) // self.page_size
+        rows = []
+        with db.cursor() as cur:
+            for page in range(first, last + 1):
+                rows.extend(self._page(cur, page))
+            # Prefetch the next page so scrolling down rarely waits on the database.
+            if (last + 1) * self.page_size <= self.total:
+                self._page(cur, last + 1)
+        start = offset - first * self.page_size
+        return rows[start:start + limit]
+
+    def _cached_position(self, voter_id):
+        for page, rows in self.pages.items():
+            for i, row in enumerate(rows):
+                if row[0] == voter_id:
+                    return page * self.page_size + i
+        return None
+
+    def position(self, voter_id):
+        # Keyset locate: the voter's page is placed where its id falls
+        # between the first and last ids, anchored on the id just before it,
+        # instead of counting every row below it. None if the voter is not
+        # on the roll (voter_locate returns no row).
+        position = self._cached_position(voter_id)
+        if position is not None:
+            return position
+
+        with db.cursor() as cur:
+            db.execute(cur, "voter_locate", (voter_id,))
+            row = cur.fetchone()
+            if row is None:
+                return None
+            previous, first_id, last_id = row
+            estimate = (voter_id - first_id) / max(1, last_id - first_id) * max(0, self.total - 1)
+            page = int(estimate) // self.page_size
+
+            if previous is None or page <= 4:
+                # Near the top the pages are cheap to walk exactly.
+                if self.located:
+                    self._reset()
+                for p in range(page + 2):
+                    self._page(cur, p)
+                position = self._cached_position(voter_id)
+                if position is not None:
+                    return position
+                page = max(page, 5)
+
+        self.pages.clear()
+        self.anchors = {page: previous}
+        self.located = True
+        return page * self.page_size
+
+    def set_status(self, voter_id, vote_status):
+        for page, rows in self.pages.items():
+            for i, row in enumerate(rows):
+                if row[0] == voter_id:
+                    rows[i] = (row[0], row[1], vote_status)
+                    return
+
+
+class ListVoterSource:
+    def __init__(self, rows):
+        self.rows = list(rows)
+        self.index = {row[0]: i for i, row in enumerate(self.rows)}
+
+    def __len__(self):
+        return len(self.rows)
+
+    def fetch(self, offset, limit):
+        return self.rows[offset:offset + limit]
+
+    def position(self, voter_id):
+        return self.index.get(voter_id)
+
+    def set_status(self, voter_id, vote_status):
+        i = self.index.get(voter_id)
+        if i is not None:
+            row = self.rows[i]
+            self.rows[i] = (row[0], row[1], vote_status)
+
+
+class VirtualVoterList(ttk.Frame):
+    # A Treeview that only ever holds the rows currently on screen; the
+    # scrollbar tracks the position within the whole source instead.
+    def __init__(self, parent, on_select, visible_rows=25):
+        super().__init__(parent)
+        self.on_select = on_select
+        self.visible_rows = visible_rows
+        self.source = ListVoterSource([])
+        self.offset = 0
+        self.selected_id = None
+
+        self.tree = ttk.Treeview(self, columns=("ID", "Name", "Status"), show="headings", height=visible_rows)
+        self.tree.heading("ID", text="ID")
+        self.tree.heading("Name", text="Name")
+        self.tree.heading("Status", text="Status")
+        self.tree.column("ID", width=50, anchor=tk.CENTER)
+        self.tree.column("Name", width=200, anchor=tk.W)
+        self.tree.column("Status", width=100, anchor=tk.CENTER)
+        self.tree.pack(side=tk.LEFT, expand=True, fill=tk.BOTH)
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self.yview)
+        self.scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+
+        self.tree.bind("<<TreeviewSelect>>", self._on_tree_select)
+        self.tree.bind("<Configure>", self._on_resize)
+        self.tree.bind("<MouseWheel>", lambda e: self.scroll(-1 if e.delta > 0 else 1))
+        self.tree.bind("<Button-4>", lambda e: self.scroll(-1))
+        self.tree.bind("<Button-5>", lambda e: self.scroll(1))
+        self.tree.bind("<Up>", self._on_key_up)
+        self.tree.bind("<Down>", self._on_key_down)
+
+    def set_source(self, source):
+        self.source = source
+        self.offset = 0
+        self.render()
+
+    def render(self):
+        rows = self.source.fetch(self.offset, self.visible_rows)
+        self.tree.delete(*self.tree.get_children())
+        for voter_id, name, vote_status in rows:
+            status = "Voted" if vote_status else "Not Voted"
+            self.tree.insert("", tk.END, iid=str(voter_id), values=(voter_id, name, status))
+
+        if self.selected_id is not None and self.tree.exists(str(self.selected_id)):
+            self.tree.selection_set(str(self.selected_id))
+
+        total = len(self.source)
+        if total:
+            self.scrollbar.set(self.offset / total, min(1.0, (self.offset + self.visible_rows) / total))
+        else:
+            self.scrollbar.set(0.0, 1.0)
+
+    def scroll_to(self, offset):
+        max_offset = max(0, len(self.source) - self.visible_rows)
+        offset = max(0, min(int(offset), max_offset))
+        if offset != self.offset:
+            self.offset = offset
+            self.render()
+
+    def scroll(self, rows):
+        self.scroll_to(self.offset + rows)
+
+    def yview(self, *args):
+        if args[0] == "moveto":
+            self.scroll_to(float(args[1]) * len(self.source))
+        elif args[0] == "scroll":
+            step = self.visible_rows if args[2] == "pages" else 1
+            self.scroll(int(args[1]) * step)
+
+    def _on_resize(self, event):
+        row_height = ttk.Style().lookup("Treeview", "rowheight") or 20
+        rows = max(1, (event.height - 25) // int(row_height))
+        if rows != self.visible_rows:
+            self.visible_rows = rows
+            self.render()
+
+    def _on_key_up(self, event):
+        children = self.tree.get_children()
+        if children and self.tree.focus() == children[0] and self.offset > 0:
+            self.scroll(-1)
+            self._select_item(self.tree.get_children()[0])
+            return "break"
+
+    def _on_key_down(self, event):
+        children = self.tree.get_children()
+        if children and self.tree.focus() == children[-1]:
+            self.scroll(1)
+            self._select_item(self.tree.get_children()[-1])
+            return "break"
+
+    def _select_item(self, item):
+        self.tree.focus(item)
+        self.tree.selection_set(item)
+
+    def _on_tree_select(self, event):
+        selection = self.tree.selection()
+        if not selection:
+            return
+        voter_id, voter_name, status = self.tree.item(selection[0])["values"]
+        if voter_id == self.selected_id:
+            return
+        self.selected_id = voter_id
+        self.on_select(voter_id, voter_name, status == "Voted")
+
+    def select_voter(self, voter_id):
+        position = self.source.position(voter_id)
+        if position is None:
+            return False
+
+        if not self.offset <= position < self.offset + self.visible_rows:
+            self.scroll_to(position - self.visible_rows // 2)
+
+        item = str(voter_id)
+        if not self.tree.exists(item):
+            return False
+
+        # Set selected_id first so the queued <<TreeviewSelect>> is ignored
+        # and on_select runs exactly once, even if the row was already selected.
+        voter_id, voter_name, status = self.tree.item(item)["values"]
+        self.selected_id = voter_id
+        self._select_item(item)
+        self.tree.see(item)
+        self.on_select(voter_id, voter_name, status == "Voted")
+        return True
+
+    def set_status(self, voter_id, vote_status):
+        self.source.set_status(voter_id, vote_status)
+        if self.tree.exists(str(voter_id)):
+            values = self.tree.item(str(voter_id))["values"]
+            self.tree.item(str(voter_id), values=(values[0], values[1], "Voted" if vote_status else "Not Voted"))
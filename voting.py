@@ -0,0 +1,60 @@
+import os
+import socket
+import time
+import db
+
+# Keypad key -> party id.
+KEY_TO_PARTY = {"1": 1, "2": 2, "3": 3}
+VOTE_TIMEOUT = 60.0
+BOOTH_ID = os.environ.get("EVM_BOOTH_ID", socket.gethostname())
+
+AWAITING_KEY = "awaiting_key"
+COMMITTED = "committed"
+ALREADY_VOTED = "already_voted"
+TIMED_OUT = "timed_out"
+FAILED = "failed"
+
+
+def commit_vote(cur, voter_id, party_id, booth_id=BOOTH_ID):
+    # True if the ballot was counted, False if the voter had already voted.
+    db.execute(cur, "cast_vote", (voter_id, party_id, booth_id))
+    return cur.fetchone()[0]
+
+
+class VoteSession:
+    # One voter's turn at the keypad: waits for a valid key, commits it and
+    # ends in COMMITTED, ALREADY_VOTED, TIMED_OUT or FAILED. Keys arriving
+    # after the session has ended are ignored.
+    def __init__(self, voter_id, timeout=VOTE_TIMEOUT, key_to_party=KEY_TO_PARTY, store=None):
+        self.voter_id = voter_id
+        self.store = store
+        self.key_to_party = key_to_party
+        self.deadline = time.monotonic() + timeout
+        self.state = AWAITING_KEY
+        self.error = None
+
+    @property
+    def finished(self):
+        return self.state != AWAITING_KEY
+
+    def on_key(self, key):
+        if self.finished or key not in self.key_to_party:
+            return self.state
+
+        try:
+            if self.store is not None:
+                # Offline-first: the booth store commits locally and syncs later.
+                recorded = self.store.record_vote(self.voter_id, self.key_to_party[key])
+            else:
+                with db.cursor() as cur:
+                    recorded = commit_vote(cur, self.voter_id, self.key_to_party[key])
+            self.state = COMMITTED if recorded else ALREADY_VOTED
+        except Exception as e:
+            self.error = e
+            self.state = FAILED
+        return self.state
+
+    def check_timeout(self, now=None):
+        if not self.finished and (now or time.monotonic()) >= self.deadline:
+            self.state = TIMED_OUT
+        return self.state